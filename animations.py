@@ -0,0 +1,337 @@
+"""Batch renderer for the scenes in scene.py.
+
+Running ``python animations.py`` renders every Scene/ThreeDScene class in
+scene.py at once on a pool of worker processes (one per core by default),
+instead of calling ``manim render`` on each class one after the other.
+
+    python animations.py                      # every scene, 1080p60
+    python animations.py -q l DotProduct Outro  # just these two, 480p15
+    python animations.py -j 4                 # at most 4 scenes at a time
+
+Each scene gets its own log file under media/logs/ and the run ends with a
+table of exit status and wall-clock time per scene.
+
+Scenes whose code hasn't changed since their last successful render are
+skipped without being imported into a worker at all (see fingerprints.py);
+pass --force to render them anyway. A scene whose render died halfway
+continues after its last finished play next time (see checkpoints.py).
+
+Before the workers start, the TeX of the scenes about to be rendered is
+compiled several snippets at a time (see tex_cache.py), so no worker sits
+waiting on latex.
+
+For one-shot renders (a fresh CI worker, say) --stream skips the segment
+cache and encodes every scene in a single pass, without partial movies.
+--also 720p30,480p15 adds smaller versions, scaled down from the same
+frames instead of rendering the scenes again at those qualities.
+
+With --trace every worker records where its render spends the time and
+writes it to media/traces/<Scene>.json, to open in Perfetto (see tracing.py).
+"""
+
+import argparse
+import inspect
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import cache_manager
+import fingerprints
+import tracing
+
+PROJECT_DIR = Path(__file__).resolve().parent
+SCENE_FILE = PROJECT_DIR / "scene.py"
+MEDIA_DIR = PROJECT_DIR / "media"
+LOG_DIR = MEDIA_DIR / "logs"
+
+# same single letter flags as ``manim render -q``
+QUALITY_FLAGS = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+
+def discover_scenes(module=None):
+    """Returns the scene classes defined in scene.py, in the order they appear in the file."""
+    from manim import Scene
+
+    if module is None:
+        import scene as module
+
+    scenes = [
+        obj for obj in vars(module).values()
+        if inspect.isclass(obj) and issubclass(obj, Scene) and obj.__module__ == module.__name__
+    ]
+    # ThreeDScene is a Scene subclass, so CrossProductMagic and SneakPeek are picked up too
+    scenes.sort(key=lambda cls: inspect.getsourcelines(cls)[1])
+    return scenes
+
+
+def video_dir(quality):
+    """Where manim writes the videos for this quality, e.g. media/videos/scene/1080p60."""
+    from manim.constants import QUALITIES
+
+    resolution = QUALITIES[quality]
+    return MEDIA_DIR / "videos" / SCENE_FILE.stem / f"{resolution['pixel_height']}p{resolution['frame_rate']}"
+
+
+def configure_manim(quality):
+    """Points the global manim config at this project's media/ folder for one render."""
+    from manim import config
+
+    config.quality = quality
+    config.input_file = str(SCENE_FILE)  # makes the output land in media/videos/scene/
+    config.media_dir = str(MEDIA_DIR)
+    config.progress_bar = "none"  # progress bars just clutter the log files
+
+
+def build_scene(scene_class, renderer_class=None, **renderer_kwargs):
+    """Instantiates a scene wired up to this project's renderer and file writer.
+
+    ``renderer_class`` defaults to LayeredRenderer (see renderer.py) and the
+    file writer to SceneWriter; extra keyword arguments are passed on to the
+    renderer.
+    """
+    from manim import Camera
+    from renderer import LayeredRenderer
+    from writer import SceneWriter
+
+    # passing our own renderer bypasses the scene's camera_class argument,
+    # so look up the default (ThreeDCamera for ThreeDScene) and hand it over
+    parameter = inspect.signature(scene_class).parameters.get("camera_class")
+    camera_class = parameter.default if parameter is not None else Camera
+    renderer_kwargs.setdefault("file_writer_class", SceneWriter)
+    renderer = (renderer_class or LayeredRenderer)(camera_class=camera_class, **renderer_kwargs)
+    return scene_class(renderer=renderer)
+
+
+def redirect_output(log_path, mode="w"):
+    """Sends everything this process prints from now on to ``log_path`` (appended to with ``mode="a"``).
+
+    Redirects at the file descriptor level so output from C libraries is
+    captured too. Meant for worker processes that only do one job, there's
+    no way back afterwards.
+    """
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with open(log_path, mode) as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+
+
+def render_scene(name, quality="high_quality", log_dir=LOG_DIR, trace=False, stream=False, extra_outputs=(),
+                 keep_log=False):
+    """Renders one scene class inside the current (worker) process.
+
+    Everything the render prints, including ffmpeg/cairo output, goes to
+    ``<log_dir>/<name>.log``. Never raises; failures are reported in the
+    returned dict so one broken scene doesn't take the whole batch down.
+    With ``trace``, a Chrome trace of the render is written to
+    media/traces/<name>.json (see tracing.py). With ``stream``, caching is
+    off and the scene is encoded in one go, without partial movies (see
+    writer.StreamingSceneWriter), plus the ``(height, frame_rate)`` versions
+    in ``extra_outputs`` from the same frames. With ``keep_log``, the log is
+    appended to rather than started over (it holds the frame-parallel
+    prerender's errors then).
+    """
+    log_path = Path(log_dir) / f"{name}.log"
+    start = time.perf_counter()
+    status = "ok"
+
+    redirect_output(log_path, "a" if keep_log else "w")
+    try:
+        import scene as scene_module
+
+        configure_manim(quality)
+        if trace:
+            tracing.enable()
+        scene_class = getattr(scene_module, name)
+        if stream:
+            from manim import config
+            from writer import StreamingSceneWriter
+
+            config.disable_caching = True
+            StreamingSceneWriter.extra_outputs = list(extra_outputs)
+            renderer_kwargs = {"file_writer_class": StreamingSceneWriter}
+        else:
+            import checkpoints
+
+            # picks up after the last finished play if a previous run of this code died
+            renderer_kwargs = {
+                "renderer_class": checkpoints.ResumableRenderer,
+                "checkpoint_file": checkpoints.checkpoint_path(name, quality),
+                "fingerprint": fingerprints.scene_fingerprint(scene_class, {"quality": quality}),
+            }
+        build_scene(scene_class, **renderer_kwargs).render()
+    except BaseException:
+        status = "failed"
+        traceback.print_exc()
+    finally:
+        if trace:
+            # a failed render's trace is the interesting one, write it either way
+            tracing.write_trace(tracing.TRACE_DIR / f"{name}.json")
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    return {
+        "scene": name,
+        "status": status,
+        "seconds": time.perf_counter() - start,
+        "log": str(log_path),
+    }
+
+
+def render_all(names, quality="high_quality", jobs=None, log_dir=LOG_DIR, trace=False, stream=False, extra_outputs=(),
+               keep_logs=False):
+    """Renders the named scenes concurrently and returns one result dict per scene."""
+    jobs = min(jobs or os.cpu_count() or 1, len(names)) or 1
+    results = []
+    # spawn + one task per child gives every scene a fresh interpreter, so the global
+    # manim config and mobject caches of one scene never leak into the next
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as pool:
+        futures = {
+            pool.submit(render_scene, name, quality, log_dir, trace, stream, extra_outputs, keep_logs): name
+            for name in names
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:  # the worker itself died (segfault, OOM kill, ...)
+                result = {
+                    "scene": futures[future],
+                    "status": f"crashed ({error.__class__.__name__})",
+                    "seconds": float("nan"),
+                    "log": str(Path(log_dir) / f"{futures[future]}.log"),
+                }
+            print(f"  {result['scene']:<24} {result['status']:<10} {result['seconds']:7.1f}s", flush=True)
+            results.append(result)
+
+    # report in file order rather than completion order
+    results.sort(key=lambda result: names.index(result["scene"]))
+    return results
+
+
+def parse_outputs(text):
+    """``"720p30,480p15"`` -> ``[(720, 30), (480, 15)]``, for --also."""
+    outputs = []
+    for item in text.split(","):
+        height, _, frame_rate = item.strip().partition("p")
+        if not (height.isdigit() and frame_rate.isdigit()):
+            raise argparse.ArgumentTypeError(f"expected something like 720p30, got {item!r}")
+        outputs.append((int(height), int(frame_rate)))
+    return outputs
+
+
+def print_summary(results, wall_time):
+    print()
+    print(f"{'scene':<24} {'status':<10} {'time':>8}  log")
+    for result in results:
+        print(f"{result['scene']:<24} {result['status']:<10} {result['seconds']:7.1f}s  {result['log']}")
+    serial_time = sum(result["seconds"] for result in results if result["seconds"] == result["seconds"])
+    print(f"\nwall clock {wall_time:.1f}s (sum of scene times {serial_time:.1f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the scenes in scene.py in parallel.")
+    parser.add_argument("scenes", nargs="*", help="scene class names to render (default: all of them)")
+    parser.add_argument("-q", "--quality", choices=QUALITY_FLAGS, default="h", help="render quality, like manim -q")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--cache-budget", type=cache_manager.parse_size, default=None,
+                        help="after rendering, evict cached segments down to this size, e.g. 2G")
+    parser.add_argument("--frame-parallel", action="store_true",
+                        help="first split each scene's long plays across all workers (see frame_parallel.py)")
+    parser.add_argument("--no-tex-warmup", action="store_true",
+                        help="don't compile the scenes' TeX concurrently before rendering (see tex_cache.py)")
+    parser.add_argument("--plan", default=None,
+                        help="plan JSON from planner.py; the most expensive scenes are started first")
+    parser.add_argument("--stream", action="store_true",
+                        help="no segment cache: encode each scene in one pass straight into its movie file")
+    parser.add_argument("--also", type=parse_outputs, default=[],
+                        help="with --stream, also write these smaller versions from the same frames, e.g. 720p30,480p15")
+    parser.add_argument("--trace", action="store_true",
+                        help="write a Chrome trace of each render to media/traces/ (see tracing.py)")
+    parser.add_argument("--force", action="store_true", help="render scenes even if their code hasn't changed")
+    parser.add_argument("--list", action="store_true", help="print the scene classes and exit")
+    args = parser.parse_args(argv)
+
+    scene_classes = {cls.__name__: cls for cls in discover_scenes()}
+    available = list(scene_classes)
+    if args.list:
+        print("\n".join(available))
+        return 0
+
+    if args.also and not args.stream:
+        parser.error("--also encodes alongside the single pass render, it needs --stream")
+    if args.stream and args.frame_parallel:
+        parser.error("--frame-parallel hands its pieces over through the segment cache, which --stream doesn't use")
+    unknown = [name for name in args.scenes if name not in available]
+    if unknown:
+        parser.error(f"unknown scene(s): {', '.join(unknown)}")
+    names = args.scenes or available
+    quality = QUALITY_FLAGS[args.quality]
+    output_dir = video_dir(quality)
+
+    settings = {"quality": quality}
+    prints = {name: fingerprints.scene_fingerprint(scene_classes[name], settings) for name in names}
+    if not args.force:
+        unchanged = [name for name in names if fingerprints.is_up_to_date(name, prints[name], output_dir)]
+        if unchanged:
+            print(f"Up to date, skipping: {', '.join(unchanged)}")
+        names = [name for name in names if name not in unchanged]
+    if not names:
+        return 0
+
+    start = time.perf_counter()
+    if not args.no_tex_warmup:
+        import tex_cache
+
+        built = tex_cache.warm_up(names, quality, args.jobs)
+        if built:
+            print(f"Compiled {built} TeX snippet(s) ahead of the render")
+
+    if args.frame_parallel:
+        import frame_parallel
+
+        for name in names:
+            # the render appends to the log, after whatever went wrong in here
+            (LOG_DIR / f"{name}.log").unlink(missing_ok=True)
+            frame_parallel.prerender_long_plays(name, quality, args.jobs)
+
+    if args.plan is not None:
+        import planner
+
+        # longest jobs first, so no worker is left with a big scene at the very end.
+        # scenes the plan doesn't know about could be anything, they go first too
+        costs = planner.scene_costs(args.plan)
+        names.sort(key=lambda name: -costs.get(name, float("inf")))
+
+    print(f"Rendering {len(names)} scene(s) at {quality}")
+    results = render_all(names, quality, args.jobs, trace=args.trace, stream=args.stream, extra_outputs=args.also,
+                         keep_logs=args.frame_parallel)
+    results.sort(key=lambda result: available.index(result["scene"]))
+    for result in results:
+        if result["status"] == "ok":
+            fingerprints.record_fingerprint(result["scene"], prints[result["scene"]], output_dir)
+    print_summary(results, time.perf_counter() - start)
+
+    if args.cache_budget is not None:
+        freed, kept_size = cache_manager.clean_cache(available, args.cache_budget)
+        print(f"cache: freed {cache_manager.format_size(freed)}, {cache_manager.format_size(kept_size)} kept")
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Joins the rendered scenes into the full lecture, without re-encoding them.
+
+The lecture is every scene of scene.py in file order, GeometricVectorScene
+to SneakPeek. The scene movies already come out of the same encoder with the
+same settings, so their packets can simply be copied one after the other
+into a single file (writer.concat_movies), which takes seconds and keeps
+every frame exactly as rendered.
+
+Before that the streams are compared (codec, resolution, frame rate, pixel
+format, time base). Scenes that differ from the rest (rendered at another
+quality, say) are re-encoded to match, and only those.
+
+MP4 chapters can't be written with the PyAV version manim pins, so the
+chapter markers (one per scene, titled with the scene's name) go next to
+the movie in two forms:
+
+* lecture_1080p60.chapters.vtt, WebVTT chapters for web players,
+* lecture_1080p60.ffmetadata, to embed them with
+  ``ffmpeg -i lecture_1080p60.mp4 -i lecture_1080p60.ffmetadata -map_metadata 1 -codec copy out.mp4``.
+
+    python assemble.py                           # every scene, 1080p60
+    python assemble.py -q l DotProduct Outro     # just these, in this order, 480p15
+"""
+
+import argparse
+import sys
+import tempfile
+from collections import Counter
+from fractions import Fraction
+from pathlib import Path
+
+import av
+
+import animations
+from writer import concat_movies
+
+LECTURE_DIR = animations.MEDIA_DIR / "lecture"
+SIGNATURE_FIELDS = ["codec", "width", "height", "frame_rate", "pix_fmt", "time_base"]
+
+
+def stream_signature(path):
+    """What has to be identical for two movies to be joined by copying their packets."""
+    with av.open(str(path)) as container:
+        stream = container.streams.video[0]
+        return {
+            "codec": stream.codec_context.name,
+            "width": stream.codec_context.width,
+            "height": stream.codec_context.height,
+            "frame_rate": stream.average_rate,
+            "pix_fmt": stream.codec_context.pix_fmt,
+            "time_base": stream.time_base,
+        }
+
+
+def movie_duration(path):
+    with av.open(str(path)) as container:
+        stream = container.streams.video[0]
+        if stream.duration is not None:
+            return float(stream.duration * stream.time_base)
+        return container.duration / av.time_base
+
+
+def reencode(source, output_file, signature):
+    """Re-encodes ``source`` with ``signature``'s codec, size, pixel format and frame rate.
+
+    Frame rates are converted by showing, at every output frame time, the
+    latest source frame.
+    """
+    frame_rate = Fraction(signature["frame_rate"])
+    with av.open(str(source)) as input_container, av.open(str(output_file), mode="w") as output_container:
+        input_stream = input_container.streams.video[0]
+        output_stream = output_container.add_stream(signature["codec"], rate=frame_rate, options={"crf": "23"})
+        # PyAV's default time base wouldn't match the other scenes and the concat fails
+        output_stream.time_base = signature["time_base"]
+        output_stream.codec_context.time_base = 1 / frame_rate
+        output_stream.width = signature["width"]
+        output_stream.height = signature["height"]
+        output_stream.pix_fmt = signature["pix_fmt"]
+
+        def emit(image, until):
+            nonlocal written
+            while written / frame_rate < until - 1e-6:
+                frame = av.VideoFrame.from_ndarray(image, format=signature["pix_fmt"])
+                frame.pts = written  # counted in frames, the stream's time base is finer
+                frame.time_base = 1 / frame_rate
+                for packet in output_stream.encode(frame):
+                    output_container.mux(packet)
+                written += 1
+
+        written = 0
+        image = None
+        for frame in input_container.decode(input_stream):
+            if image is not None:
+                emit(image, frame.time)
+            image = frame.reformat(
+                width=signature["width"], height=signature["height"], format=signature["pix_fmt"]
+            ).to_ndarray()
+        if image is not None:
+            emit(image, movie_duration(source))
+        for packet in output_stream.encode():
+            output_container.mux(packet)
+
+
+def write_chapters(chapters, movie_file):
+    """Writes ``[(title, start, end), ...]`` (seconds) as WebVTT and ffmetadata next to ``movie_file``."""
+    def timestamp(seconds):
+        milliseconds = round(seconds * 1000)
+        hours, milliseconds = divmod(milliseconds, 3_600_000)
+        minutes, milliseconds = divmod(milliseconds, 60_000)
+        return f"{hours:02}:{minutes:02}:{milliseconds // 1000:02}.{milliseconds % 1000:03}"
+
+    vtt = ["WEBVTT", ""]
+    ffmetadata = [";FFMETADATA1"]
+    for index, (title, start, end) in enumerate(chapters, 1):
+        vtt += [str(index), f"{timestamp(start)} --> {timestamp(end)}", title, ""]
+        ffmetadata += ["[CHAPTER]", "TIMEBASE=1/1000", f"START={round(start * 1000)}", f"END={round(end * 1000)}",
+                       f"title={title}"]
+    movie_file = Path(movie_file)
+    movie_file.with_suffix(".chapters.vtt").write_text("\n".join(vtt), encoding="utf-8")
+    movie_file.with_suffix(".ffmetadata").write_text("\n".join(ffmetadata) + "\n", encoding="utf-8")
+
+
+def assemble(names, quality="high_quality", output_file=None):
+    """Joins the movies of the scenes ``names`` (in that order) into one. Returns its path."""
+    input_dir = animations.video_dir(quality)
+    output_file = Path(output_file or LECTURE_DIR / f"lecture_{input_dir.name}.mp4")
+    movies = {name: input_dir / f"{name}.mp4" for name in names}
+    missing = [name for name, path in movies.items() if not path.exists()]
+    if missing:
+        raise FileNotFoundError(f"not rendered at {input_dir.name} yet: {', '.join(missing)}")
+
+    signatures = {name: stream_signature(path) for name, path in movies.items()}
+    # match whatever most scenes already are, so the fewest get re-encoded
+    counts = Counter(tuple(signature[field] for field in SIGNATURE_FIELDS) for signature in signatures.values())
+    target = dict(zip(SIGNATURE_FIELDS, counts.most_common(1)[0][0]))
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="assemble_", dir=output_file.parent) as temp_dir:
+        parts = []
+        for name, path in movies.items():
+            if signatures[name] != target:
+                differences = [field for field in SIGNATURE_FIELDS if signatures[name][field] != target[field]]
+                print(f"re-encoding {name} ({', '.join(differences)} differ)", flush=True)
+                path = Path(temp_dir) / path.name
+                reencode(movies[name], path, target)
+                if stream_signature(path) != target:
+                    raise ValueError(f"re-encoding {name} didn't produce a movie that can be joined to the others")
+            parts.append(path)
+
+        chapters = []
+        start = 0.0
+        for name, path in zip(movies, parts):
+            duration = movie_duration(path)
+            chapters.append((name, start, start + duration))
+            start += duration
+        concat_movies(parts, output_file)
+    write_chapters(chapters, output_file)
+    return output_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Join the rendered scenes into the full lecture without re-encoding.")
+    parser.add_argument("scenes", nargs="*", help="scene class names in lecture order (default: all, in file order)")
+    parser.add_argument("-q", "--quality", choices=animations.QUALITY_FLAGS, default="h")
+    parser.add_argument("-o", "--output", default=None, help="output movie (default: media/lecture/lecture_<res>.mp4)")
+    args = parser.parse_args(argv)
+
+    available = [cls.__name__ for cls in animations.discover_scenes()]
+    unknown = [name for name in args.scenes if name not in available]
+    if unknown:
+        parser.error(f"unknown scene(s): {', '.join(unknown)}")
+    try:
+        output_file = assemble(args.scenes or available, animations.QUALITY_FLAGS[args.quality], args.output)
+    except (FileNotFoundError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    print(f"lecture written to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""Render benchmarks per scene, with stored baselines to catch slowdowns.
+
+Each scene is rendered from scratch in a fresh process, one scene at a
+time: segment caching off, and output plus every on-disk cache (compiled
+TeX, parsed Text glyphs, snapshots) in a throwaway folder of its own, so
+the numbers don't depend on what ran before and the real videos, segment
+store and caches aren't touched. It's measured:
+
+* construct: time spent in construct() outside of play()/wait(), i.e.
+  building mobjects, Text, TeX, ...,
+* raster: time spent rasterizing frames (every update_frame), per play too,
+* wait: time the renderer waited for the encoder to free a frame buffer
+  (see writer.SceneWriter), not counted as raster,
+* encode: time the writer thread spent encoding frames (overlaps raster),
+* combine: joining the partial movies at the end,
+* fps: frames written per second of total render time,
+* peak_rss_mb: the worker's peak resident memory.
+
+    python benchmark.py                          # all scenes, 480p15, compared to the baseline
+    python benchmark.py --profile high DotProduct
+    python benchmark.py --save-baseline          # make this run the new baseline
+
+Baselines live in benchmarks/<profile>.json. They are only comparable on
+the machine that recorded them. The run fails (exit status 1) when any
+scene's total render time exceeds its baseline by more than --threshold
+(default 20%). The latest results are kept in media/benchmarks/ either way.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from manim import __version__ as manim_version
+from manim import config
+
+import animations
+from renderer import LayeredRenderer
+from writer import SceneWriter
+
+PROFILES = {"low": "low_quality", "high": "high_quality"}
+BASELINE_DIR = animations.PROJECT_DIR / "benchmarks"
+RESULT_DIR = animations.MEDIA_DIR / "benchmarks"
+DEFAULT_THRESHOLD = 0.2
+# bumped when what the fields measure changes, older baselines are flagged for re-recording
+TIMINGS_VERSION = 2  # 2: raster without the waits for a free frame buffer
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+class TimedWriter(SceneWriter):
+    encode_seconds = 0.0  # runs in the writer thread, one writer per worker process
+    wait_seconds = 0.0  # render thread, waiting for the encoder to hand a frame buffer back
+
+    def take_free_buffer(self):
+        start = time.perf_counter()
+        index = super().take_free_buffer()
+        TimedWriter.wait_seconds += time.perf_counter() - start
+        return index
+
+    def encode_and_write_frame(self, frame, num_frames):
+        start = time.perf_counter()
+        super().encode_and_write_frame(frame, num_frames)
+        TimedWriter.encode_seconds += time.perf_counter() - start
+
+
+class TimedRenderer(LayeredRenderer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.play_times = []
+        self.raster_seconds = 0.0
+        self.frames = 0
+        self.combine_seconds = 0.0
+
+    def play(self, scene, *args, **kwargs):
+        start = time.perf_counter()
+        raster_before = self.raster_seconds
+        super().play(scene, *args, **kwargs)
+        self.play_times.append({
+            "index": len(self.play_times),
+            "seconds": time.perf_counter() - start,
+            "raster_seconds": self.raster_seconds - raster_before,
+        })
+
+    def update_frame(self, *args, **kwargs):
+        # LayeredRenderer borrows the frame buffer to draw in first, which waits while the encoder
+        # is behind. That's encoding time showing up here, not drawing
+        start = time.perf_counter()
+        wait_before = TimedWriter.wait_seconds
+        super().update_frame(*args, **kwargs)
+        self.raster_seconds += time.perf_counter() - start - (TimedWriter.wait_seconds - wait_before)
+
+    def add_frame(self, frame, num_frames=1):
+        super().add_frame(frame, num_frames)
+        self.frames += num_frames
+
+    def scene_finished(self, scene):
+        start = time.perf_counter()
+        super().scene_finished(scene)
+        self.combine_seconds = time.perf_counter() - start
+
+
+def benchmark_scene(name, quality, work_dir, log_dir=animations.LOG_DIR):
+    """Worker side: renders ``name`` once with timing hooks and returns the measurements."""
+    animations.redirect_output(Path(log_dir) / f"benchmark_{name}.log")
+    try:
+        import scene as scene_module
+
+        import snapshots
+
+        animations.configure_manim(quality)
+        # render everything for real, into a folder that is thrown away afterwards, without going
+        # near the real segment store or its manifests, and with every cache cold like on a fresh checkout
+        run_dir = Path(tempfile.mkdtemp(prefix=f"{name}_", dir=work_dir))
+        config.disable_caching = True
+        config.video_dir = str(run_dir / "videos")
+        config.tex_dir = str(run_dir / "Tex")
+        config.text_dir = str(run_dir / "texts")
+        snapshots.SNAPSHOT_DIR = run_dir / "snapshots"
+        TimedWriter.segment_dir = run_dir / "segments"
+
+        start = time.perf_counter()
+        scene = animations.build_scene(
+            getattr(scene_module, name), renderer_class=TimedRenderer, file_writer_class=TimedWriter
+        )
+        scene.render()
+        total = time.perf_counter() - start
+
+        renderer = scene.renderer
+        play_seconds = sum(play["seconds"] for play in renderer.play_times)
+        return {
+            "scene": name,
+            "status": "ok",
+            "total_seconds": total,
+            "construct_seconds": total - play_seconds - renderer.combine_seconds,
+            "raster_seconds": renderer.raster_seconds,
+            "wait_seconds": TimedWriter.wait_seconds,
+            "encode_seconds": TimedWriter.encode_seconds,
+            "combine_seconds": renderer.combine_seconds,
+            "frames": renderer.frames,
+            "fps": renderer.frames / total,
+            "peak_rss_mb": peak_rss_mb(),
+            "plays": renderer.play_times,
+        }
+    except BaseException:
+        traceback.print_exc()
+        return {"scene": name, "status": "failed"}
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def run_benchmarks(names, quality, repeat=1):
+    """Benchmarks the scenes one after the other, each in a fresh process; keeps the fastest of ``repeat`` runs."""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as work_dir:
+        for name in names:
+            runs = []
+            for _ in range(repeat):
+                # one at a time, anything running next to it would skew the numbers
+                with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+                    runs.append(pool.submit(benchmark_scene, name, quality, work_dir).result())
+            ok_runs = [run for run in runs if run["status"] == "ok"]
+            result = min(ok_runs, key=lambda run: run["total_seconds"]) if ok_runs else runs[0]
+            print(f"  {name:<24} {result.get('total_seconds', float('nan')):7.1f}s", flush=True)
+            results.append(result)
+    return results
+
+
+def baseline_path(profile):
+    return BASELINE_DIR / f"{profile}.json"
+
+
+def load_baseline(profile):
+    path = baseline_path(profile)
+    if not path.exists():
+        return {}
+    baseline = json.loads(path.read_text())
+    if baseline.get("timings_version", 1) != TIMINGS_VERSION:
+        # totals are still comparable, the breakdown isn't
+        print(f"{path} was recorded with older timings, record it again with --save-baseline")
+    return {result["scene"]: result for result in baseline["scenes"]}
+
+
+def save_results(path, profile, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "profile": profile,
+        "quality": PROFILES[profile],
+        "recorded_at": time.time(),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "manim": manim_version,
+        "timings_version": TIMINGS_VERSION,
+        "scenes": results,
+    }, indent=4))
+
+
+def compare(results, baseline, threshold):
+    """Prints results next to the baseline and returns the scenes that got slower than allowed."""
+    regressions = []
+    print(f"\n{'scene':<24} {'total':>8} {'baseline':>9} {'change':>8} {'construct':>10} {'raster':>8} "
+          f"{'wait':>8} {'encode':>8} {'fps':>7} {'rss':>8}")
+    for result in results:
+        if result["status"] != "ok":
+            print(f"{result['scene']:<24} failed")
+            regressions.append(result["scene"])
+            continue
+        base = baseline.get(result["scene"])
+        if base is None or base.get("status") != "ok":
+            baseline_text, change_text = "-", "-"
+        else:
+            change = result["total_seconds"] / base["total_seconds"] - 1
+            baseline_text, change_text = f"{base['total_seconds']:8.1f}s", f"{change:+7.0%}"
+            if change > threshold:
+                regressions.append(result["scene"])
+                change_text += "!"
+        print(f"{result['scene']:<24} {result['total_seconds']:7.1f}s {baseline_text:>9} {change_text:>8} "
+              f"{result['construct_seconds']:9.1f}s {result['raster_seconds']:7.1f}s {result['wait_seconds']:7.1f}s "
+              f"{result['encode_seconds']:7.1f}s "
+              f"{result['fps']:7.1f} {result['peak_rss_mb']:6.0f}MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark rendering each scene and compare against a baseline.")
+    parser.add_argument("scenes", nargs="*", help="scene class names (default: all of them)")
+    parser.add_argument("--profile", choices=PROFILES, default="low", help="low: 480p15 (quick), high: 1080p60")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown against the baseline, as a fraction (default 0.2)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scene, the fastest one counts")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    available = [cls.__name__ for cls in animations.discover_scenes()]
+    unknown = [name for name in args.scenes if name not in available]
+    if unknown:
+        parser.error(f"unknown scene(s): {', '.join(unknown)}")
+    names = args.scenes or available
+
+    print(f"Benchmarking {len(names)} scene(s), profile {args.profile}")
+    results = run_benchmarks(names, PROFILES[args.profile], args.repeat)
+    save_results(RESULT_DIR / f"latest_{args.profile}.json", args.profile, results)
+    baseline = load_baseline(args.profile)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        # keep the baseline of scenes that weren't part of this run
+        merged = {**baseline, **{result["scene"]: result for result in results}}
+        save_results(baseline_path(args.profile), args.profile, [merged[name] for name in available if name in merged])
+        print(f"\nbaseline saved to {baseline_path(args.profile)}")
+        return 0
+    if regressions:
+        print(f"\nslower than the baseline allows (+{args.threshold:.0%}): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Housekeeping for the segment cache under media/.
+
+    python cache_manager.py                  # drop segments no scene uses anymore
+    python cache_manager.py --max-size 2G    # evict down to a 2 GB budget
+    python cache_manager.py --max-size 2G -n # same, but only print what would go
+
+Every run first drops segments that no current scene references anymore:
+segments not listed in any manifest written by segment_cache.py, manifests
+and partial_movie_files/ folders of classes that are no longer in scene.py
+(VectorMagic, GeometricVsNumerical, ...), and temp files left behind by
+crashed workers. The variants rendered by variants.py count as scenes too,
+as long as they have a movie with a fingerprint under media/videos/variants/. If the cache is still over budget, the least recently used
+segments go next. Last use is the file's access time, which the render bumps
+explicitly every time it reuses a segment (many file systems don't update
+atime on reads by themselves).
+"""
+
+import argparse
+import json
+import re
+import shutil
+import time
+from pathlib import Path
+
+MEDIA_DIR = Path(__file__).resolve().parent / "media"
+SEGMENT_DIR = MEDIA_DIR / "segments"
+VIDEO_DIR = MEDIA_DIR / "videos" / "scene"
+VARIANT_DIR = MEDIA_DIR / "videos" / "variants"
+
+MOVIE_EXTENSIONS = {".mp4", ".mov", ".webm"}
+# leftovers from a worker that died mid-encode; anything this old isn't being written anymore
+STALE_TEMP_SECONDS = 24 * 60 * 60
+# a render only writes its manifest when the scene is done, so brand new segments
+# look unreferenced for a while; leave those alone
+UNREFERENCED_GRACE_SECONDS = 60 * 60
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(text):
+    """'500M' -> 524288000. Plain numbers are bytes."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)i?B?\s*", text.upper())
+    if match is None:
+        raise ValueError(f"can't parse size {text!r}, expected something like 500M or 2G")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(size):
+    for unit in ["B", "K", "M", "G"]:
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+
+def _movies(folder):
+    return [path for path in Path(folder).rglob("*") if path.suffix in MOVIE_EXTENSIONS and path.is_file()]
+
+
+def variant_names(variant_dir=VARIANT_DIR):
+    """Names of the variants variants.py rendered successfully, from their fingerprint files."""
+    return {path.name.removesuffix(".fingerprint.json") for path in Path(variant_dir).glob("*/*.fingerprint.json")}
+
+
+def referenced_segments(scene_names, segment_dir=SEGMENT_DIR):
+    """Segments used by the last render of any current scene, plus stale manifests."""
+    referenced = set()
+    stale_manifests = []
+    for manifest in (Path(segment_dir) / "manifests").glob("*/*.json"):
+        if manifest.stem not in scene_names:
+            stale_manifests.append(manifest)
+            continue
+        try:
+            segments = json.loads(manifest.read_text())["segments"]
+        except (OSError, ValueError, KeyError):
+            continue
+        referenced.update((Path(segment_dir) / segment).resolve() for segment in segments)
+    return referenced, stale_manifests
+
+
+def plan_cleanup(scene_names, max_size=None, segment_dir=SEGMENT_DIR, video_dir=VIDEO_DIR, variant_dir=VARIANT_DIR):
+    """Works out what to delete without touching anything.
+
+    Returns ``(paths, kept_size)`` where ``paths`` is a list of
+    ``(path, reason)`` in deletion order.
+    """
+    # variants write their manifests under their own names, e.g. DotProduct_001
+    scene_names = set(scene_names) | variant_names(variant_dir)
+    referenced, stale_manifests = referenced_segments(scene_names, segment_dir)
+    doomed = [(manifest, "scene removed") for manifest in stale_manifests]
+    candidates = []  # segments that are still in use, evictable by LRU if over budget
+    now = time.time()
+
+    for path in _movies(segment_dir):
+        if ".tmp" in path.suffixes:
+            if now - path.stat().st_mtime > STALE_TEMP_SECONDS:
+                doomed.append((path, "abandoned temp file"))
+        elif path.resolve() not in referenced:
+            if now - path.stat().st_atime > UNREFERENCED_GRACE_SECONDS:
+                doomed.append((path, "unreferenced"))
+        else:
+            candidates.append(path)
+
+    # the per-scene folders manim used before the shared store
+    for scene_folder in Path(video_dir).glob("*/partial_movie_files/*"):
+        if not scene_folder.is_dir():
+            continue
+        manifest = Path(segment_dir) / "manifests" / scene_folder.parent.parent.name / f"{scene_folder.name}.json"
+        if scene_folder.name not in scene_names:
+            doomed.append((scene_folder, "scene removed"))
+        elif manifest.exists():
+            # rendered through the store since, whatever is left here wasn't needed
+            doomed.extend((path, "unreferenced") for path in _movies(scene_folder))
+        else:
+            # could still be adopted into the store by the next render
+            candidates.extend(_movies(scene_folder))
+
+    kept_size = sum(path.stat().st_size for path in candidates)
+    if max_size is not None and kept_size > max_size:
+        for path in sorted(candidates, key=lambda path: path.stat().st_atime):
+            if kept_size <= max_size:
+                break
+            kept_size -= path.stat().st_size
+            doomed.append((path, "least recently used"))
+    return doomed, kept_size
+
+
+def _size(path):
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.rglob("*") if child.is_file())
+    return path.stat().st_size
+
+
+def clean_cache(scene_names, max_size=None, dry_run=False, segment_dir=SEGMENT_DIR, video_dir=VIDEO_DIR,
+                variant_dir=VARIANT_DIR):
+    """Deletes stale segments, then LRU evicts until the cache fits in ``max_size`` bytes."""
+    doomed, kept_size = plan_cleanup(scene_names, max_size, segment_dir, video_dir, variant_dir)
+    freed = 0
+    for path, reason in doomed:
+        size = _size(path)
+        freed += size
+        print(f"{'would remove' if dry_run else 'removing'} {path} ({format_size(size)}, {reason})")
+        if dry_run:
+            continue
+        try:
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except FileNotFoundError:  # another worker's cleanup got there first
+            pass
+
+    # tidy up fan out folders that ended up empty
+    if not dry_run:
+        for folder in Path(segment_dir).glob("*"):
+            if folder.is_dir() and folder.name != "manifests" and not any(folder.iterdir()):
+                folder.rmdir()
+    return freed, kept_size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evict stale and least recently used segments from media/.")
+    parser.add_argument("--max-size", type=parse_size, default=None, help="disk budget for cached segments, e.g. 500M or 2G")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only print what would be removed")
+    args = parser.parse_args(argv)
+
+    from animations import discover_scenes
+
+    scene_names = [cls.__name__ for cls in discover_scenes()]
+    freed, kept_size = clean_cache(scene_names, args.max_size, args.dry_run)
+    print(f"{'would free' if args.dry_run else 'freed'} {format_size(freed)}, {format_size(kept_size)} of segments kept")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
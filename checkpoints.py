@@ -0,0 +1,108 @@
+"""Resuming a scene render after a crash, from the last finished play().
+
+Every finished play()/wait() already leaves its segment in the shared
+segment store (see segment_cache.py), so a rerun never encodes it again.
+It still costs something though: construct() runs from the top, and for
+every play manim hashes the whole scene to look the segment up, then
+rasterizes the static background and the final frame of a play whose
+frames it is about to throw away. Near the end of WorkIntegral or
+CrossProductMagic that adds up.
+
+ResumableRenderer writes a checkpoint after each play: the list of segment
+hashes so far, in media/checkpoints/<resolution>/<Scene>.json, tagged with
+the scene's fingerprint (fingerprints.py). A rerun of unchanged code
+replays construct() with every checkpointed play fast-forwarded: the
+animations jump straight to their end state, the segment is taken from the
+checkpoint without hashing anything and nothing is drawn, until the first
+play that never finished. From there it renders normally.
+
+Python can't be stopped and restarted in the middle of construct(), so the
+scene state of a play is rebuilt by running the code up to it rather than
+by unpickling a snapshot. That replay is only the mobject bookkeeping,
+which is quick next to rendering.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from manim import logger
+
+import animations
+from renderer import LayeredRenderer
+
+CHECKPOINT_DIR = animations.MEDIA_DIR / "checkpoints"
+
+
+def checkpoint_path(scene_name, quality):
+    return CHECKPOINT_DIR / animations.video_dir(quality).name / f"{scene_name}.json"
+
+
+def load_checkpoint(path, fingerprint):
+    """The segment hashes of the plays finished so far, or [] if there's no checkpoint for this code."""
+    try:
+        checkpoint = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return []
+    return checkpoint["segments"] if checkpoint.get("fingerprint") == fingerprint else []
+
+
+def save_checkpoint(path, fingerprint, segments):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps({"fingerprint": fingerprint, "segments": segments}))
+    os.replace(temp_path, path)
+
+
+class ResumableRenderer(LayeredRenderer):
+    """LayeredRenderer that checkpoints after every play and fast-forwards checkpointed plays.
+
+    Without ``checkpoint_file`` it's just a LayeredRenderer.
+    """
+
+    def __init__(self, *args, checkpoint_file=None, fingerprint=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkpoint_file = checkpoint_file
+        self.fingerprint = fingerprint
+        self.checkpointed = load_checkpoint(checkpoint_file, fingerprint) if checkpoint_file else []
+        self.resumed_plays = 0
+
+    def can_resume(self, play_hash):
+        # "uncached_..." hashes (caching off) don't name a segment, and the segment may have been evicted
+        return (
+            play_hash is not None
+            and not play_hash.startswith("uncached_")
+            and self.file_writer.is_already_cached(play_hash)
+        )
+
+    def play(self, scene, *args, **kwargs):
+        index = self.num_plays
+        # only while every play so far was resumed too, the scene's state depends on them
+        if (
+            self.resumed_plays == index
+            and index < len(self.checkpointed)
+            and self.can_resume(self.checkpointed[index])
+        ):
+            self.fast_forward(scene, self.checkpointed[index], *args, **kwargs)
+            return
+        super().play(scene, *args, **kwargs)
+        if self.checkpoint_file is not None:
+            save_checkpoint(self.checkpoint_file, self.fingerprint, self.animations_hashes)
+
+    def fast_forward(self, scene, play_hash, *args, **kwargs):
+        # CairoRenderer.play for a segment that is already cached, minus hashing the scene,
+        # drawing the static background and drawing the final frame
+        self.skip_animations = self._original_skipping_status
+        self.update_skipping_status()
+        scene.compile_animation_data(*args, **kwargs)
+        self.file_writer.add_partial_movie_file(play_hash)
+        self.animations_hashes.append(play_hash)
+        self.time += scene.duration
+        self.skip_animations = True
+        scene.begin_animations()
+        scene.play_internal(skip_rendering=True)  # one step, straight to the end state while skipping
+        self.skip_animations = self._original_skipping_status
+        logger.info(f"Animation {self.num_plays} : Resumed from the checkpoint (hash : {play_hash})")
+        self.num_plays += 1
+        self.resumed_plays += 1
@@ -0,0 +1,97 @@
+"""Change detection for the scene classes in scene.py.
+
+A scene's fingerprint is a hash of its class source (construct() plus any
+helpers defined inside it, like WorkIntegral.run_push_scenario), the source
+of any project modules scene.py pulls helpers from, the manim version and
+the render settings. It is computed from the source alone, construct() is
+never run, so checking all scenes costs a few milliseconds.
+
+The fingerprint of the last successful render is stored next to the video,
+e.g. media/videos/scene/1080p60/DotProduct.fingerprint.json, so a rebuild
+only has to render the scenes whose fingerprint no longer matches.
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import sys
+import textwrap
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent
+
+
+def _normalized_source(obj):
+    # Going through the AST means edits to comments, blank lines or
+    # indentation don't count as changes and don't cause a re-render
+    source = textwrap.dedent(inspect.getsource(obj))
+    return ast.dump(ast.parse(source))
+
+
+def _is_project_module(module):
+    path = getattr(module, "__file__", None)
+    return path is not None and PROJECT_DIR in Path(path).resolve().parents
+
+
+def _local_dependencies(scene_class):
+    """Project modules (other than scene.py itself) that scene.py uses names from."""
+    scene_module = sys.modules[scene_class.__module__]
+    dependencies = {}
+    for value in vars(scene_module).values():
+        if inspect.ismodule(value):
+            module = value
+        else:
+            module_name = getattr(value, "__module__", None)
+            module = sys.modules.get(module_name) if isinstance(module_name, str) else None
+        if module is not None and module is not scene_module and _is_project_module(module):
+            dependencies[module.__name__] = module
+    return [dependencies[name] for name in sorted(dependencies)]
+
+
+def scene_fingerprint(scene_class, settings=None):
+    """Returns a hex digest that changes whenever the rendered output of ``scene_class`` could."""
+    import manim
+
+    digest = hashlib.sha256()
+    digest.update(f"manim {manim.__version__}\n".encode())
+    digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode())
+
+    # the class itself plus any base classes defined in this project
+    for cls in scene_class.__mro__:
+        if _is_project_module(sys.modules[cls.__module__]):
+            digest.update(_normalized_source(cls).encode())
+    for module in _local_dependencies(scene_class):
+        digest.update(_normalized_source(module).encode())
+    return digest.hexdigest()
+
+
+def fingerprint_path(video_dir, scene_name):
+    return Path(video_dir) / f"{scene_name}.fingerprint.json"
+
+
+def stored_fingerprint(video_dir, scene_name):
+    """Returns the fingerprint recorded at the last successful render, or None."""
+    try:
+        with open(fingerprint_path(video_dir, scene_name)) as file:
+            return json.load(file)["fingerprint"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def is_up_to_date(scene_name, fingerprint, video_dir, extension=".mp4"):
+    """True when the video exists and was rendered from code with this fingerprint."""
+    video = Path(video_dir) / f"{scene_name}{extension}"
+    return video.exists() and stored_fingerprint(video_dir, scene_name) == fingerprint
+
+
+def record_fingerprint(scene_name, fingerprint, video_dir):
+    import manim
+
+    path = fingerprint_path(video_dir, scene_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "scene": scene_name,
+        "fingerprint": fingerprint,
+        "manim": manim.__version__,
+    }, indent=4))
@@ -0,0 +1,270 @@
+"""Frame-parallel rendering of single long play() calls.
+
+Long plays like SneakPeek's 10 s Rotate (600 frames at 1080p60) or the 6 s
+t_tracker sweep in QuantumWave are rendered on one core even when the rest
+of the machine is idle. Their frames only depend on the animation's alpha,
+so they can be split up:
+
+1. a probe run executes construct() with every play skipped (no frames) and
+   records how long each play is,
+2. every long play's frame range is cut into one chunk per worker. Each
+   worker fast-forwards through construct() in manim's skip mode to the
+   start of that play, jumps straight to the alpha of its first frame and
+   renders only its own frames into a chunk file,
+3. the chunks are joined without re-encoding and stored in the segment
+   store (segment_cache.py) under the play's normal cache key.
+
+The regular render of the scene afterwards finds those plays already cached
+and only renders the short ones.
+
+    python frame_parallel.py SneakPeek QuantumWave    # then render as usual
+    python animations.py --frame-parallel SneakPeek   # or both in one go
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from manim import CairoRenderer, config
+from manim.utils.exceptions import EndSceneEarlyException
+from manim.utils.hashing import get_hash_from_play_call
+
+import animations
+from renderer import LayeredRenderer
+from segment_cache import SEGMENT_DIR, segment_key, segment_path
+from writer import concat_movies
+
+CHUNK_DIR = SEGMENT_DIR / "chunks"
+# below this a play isn't worth the cost of every worker re-running construct() up to it
+MIN_SECONDS = 3
+
+
+class ProbeRenderer(CairoRenderer):
+    """Runs construct() without rendering anything and records what each play was.
+
+    Plays at least ``hash_min_seconds`` long also get their cache hash, so
+    callers can tell whether they are in the segment store already.
+    """
+
+    def __init__(self, hash_min_seconds=None, **kwargs):
+        super().__init__(skip_animations=True, **kwargs)
+        self.hash_min_seconds = hash_min_seconds
+        self.plays = []
+
+    def play(self, scene, *args, **kwargs):
+        # what CairoRenderer.play does for a skipped play, minus the file writer
+        # and the rasterization of the final frame
+        scene.compile_animation_data(*args, **kwargs)
+        static_wait = scene.is_current_animation_frozen_frame()
+        play_hash = None
+        if self.hash_min_seconds is not None and scene.duration >= self.hash_min_seconds and not static_wait:
+            play_hash = get_hash_from_play_call(scene, self.camera, scene.animations, scene.mobjects)
+        play = {
+            "index": self.num_plays,
+            "duration": scene.duration,
+            "static_wait": static_wait,
+            "animations": [str(animation) for animation in scene.animations],
+            "hash": play_hash,
+        }
+
+        scene.begin_animations()
+        self.plays.append(self.describe_play(scene, play))
+        if not static_wait:
+            scene.play_internal(skip_rendering=True)  # in skip mode this jumps to the end state
+        self.time += scene.duration
+        self.num_plays += 1
+
+    def describe_play(self, scene, play):
+        """Hook for subclasses to add to ``play``; called once the animations have begun."""
+        return play
+
+    def scene_finished(self, scene):
+        # nothing was rendered, keep the file writer from touching the scene's movie and manifest
+        pass
+
+
+class FrameRangeRenderer(LayeredRenderer):
+    """Renders frames ``[start, stop)`` of play number ``play_index`` into ``chunk_path``.
+
+    Everything before that play is skipped, and the scene ends right after
+    the chunk is written.
+    """
+
+    def __init__(self, play_index, frame_range, chunk_path, **kwargs):
+        super().__init__(**kwargs)
+        self.play_index = play_index
+        self.frame_range = frame_range
+        self.chunk_path = chunk_path
+        self.play_hash = None
+
+    def play(self, scene, *args, **kwargs):
+        if self.num_plays < self.play_index:
+            # plain manim skipping, every animation jumps to its end state
+            self._original_skipping_status = True
+            return super().play(scene, *args, **kwargs)
+
+        self.skip_animations = False
+        scene.compile_animation_data(*args, **kwargs)
+        self.play_hash = get_hash_from_play_call(scene, self.camera, scene.animations, scene.mobjects)
+        scene.begin_animations()
+        self.save_static_frame_data(scene, scene.static_mobjects)
+
+        # same frame times as Scene.get_time_progression, just our slice of them.
+        # update_to_time jumps straight to the first one, the animations only
+        # depend on alpha so there's no need to step through the frames before it
+        start, stop = self.frame_range
+        times = np.arange(0, scene.duration, 1 / config["frame_rate"])[start:stop]
+        self.file_writer.begin_animation(True, file_path=str(self.chunk_path))
+        for t in times:
+            scene.update_to_time(t)
+            self.render(scene, t, scene.moving_mobjects)
+        self.file_writer.end_animation(True)
+        raise EndSceneEarlyException()
+
+    def render(self, scene, time, moving_mobjects):
+        if not self.skip_animations:
+            super().render(scene, time, moving_mobjects)
+
+    def scene_finished(self, scene):
+        # only a chunk was rendered, don't let the file writer combine a scene movie
+        pass
+
+
+def frame_count(duration, frame_rate):
+    return len(np.arange(0, duration, 1 / frame_rate))
+
+
+def split_frames(num_frames, num_chunks):
+    """[start, stop) ranges covering ``num_frames`` in at most ``num_chunks`` near equal pieces."""
+    bounds = np.linspace(0, num_frames, min(num_chunks, num_frames) + 1).round().astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def probe_plays(scene_name, quality, hash_min_seconds=None):
+    """Returns the list of plays in a scene, see ProbeRenderer. Runs construct() without rendering."""
+    import scene as scene_module
+
+    animations.configure_manim(quality)
+    scene = animations.build_scene(
+        getattr(scene_module, scene_name), renderer_class=ProbeRenderer, hash_min_seconds=hash_min_seconds
+    )
+    scene.render()
+    return scene.renderer.plays
+
+
+def render_chunk(scene_name, quality, play_index, frame_range, chunk_path, log_path):
+    """Worker side: renders one chunk, returns the hash of the play it belongs to."""
+    import scene as scene_module
+
+    animations.redirect_output(log_path)
+    try:
+        animations.configure_manim(quality)
+        scene = animations.build_scene(
+            getattr(scene_module, scene_name),
+            renderer_class=FrameRangeRenderer,
+            play_index=play_index,
+            frame_range=frame_range,
+            chunk_path=chunk_path,
+        )
+        scene.render()
+        return scene.renderer.play_hash
+    except BaseException:
+        traceback.print_exc()
+        raise
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def log_error(scene_name, log_dir, what):
+    """Appends the exception being handled to the scene's log and says so."""
+    log_path = Path(log_dir) / f"{scene_name}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a") as log:
+        print(f"Frame-parallel render of {what} failed, left to the normal render:", file=log)
+        traceback.print_exc(file=log)
+    print(f"{scene_name}: frame-parallel render of {what} failed, see {log_path}", flush=True)
+
+
+def prerender_long_plays(scene_name, quality="high_quality", jobs=None, min_seconds=MIN_SECONDS,
+                         log_dir=animations.LOG_DIR):
+    """Renders every play of ``scene_name`` longer than ``min_seconds`` across ``jobs`` processes.
+
+    Plays that are already in the segment store are left alone. Returns the
+    indices of the plays that were rendered. A play whose chunks fail is
+    left to the normal render of the scene, with the error appended to the
+    scene's log (``<log_dir>/<scene>.log``).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    animations.configure_manim(quality)
+    fps = config["frame_rate"]
+    try:
+        probed = probe_plays(scene_name, quality, hash_min_seconds=min_seconds)
+    except Exception:
+        log_error(scene_name, log_dir, "the probe run")
+        return []
+    plays = [
+        play for play in probed
+        # held waits are cheap already (see writer.py)
+        if play["hash"] is not None and not segment_path(segment_key(play["hash"])).exists()
+    ]
+
+    rendered = []
+    context = multiprocessing.get_context("spawn")
+    for play in plays:
+        ranges = split_frames(frame_count(play["duration"], fps), jobs)
+        chunk_paths = [
+            CHUNK_DIR / f"{scene_name}_{play['index']:03}_{i:03}{config.movie_file_extension}"
+            for i in range(len(ranges))
+        ]
+        temp_path = None
+        try:
+            with ProcessPoolExecutor(max_workers=len(ranges), mp_context=context, max_tasks_per_child=1) as pool:
+                futures = [
+                    pool.submit(
+                        render_chunk, scene_name, quality, play["index"], frame_range, chunk_path,
+                        Path(log_dir) / f"{scene_name}.play{play['index']:03}.chunk{i:03}.log",
+                    )
+                    for i, (frame_range, chunk_path) in enumerate(zip(ranges, chunk_paths))
+                ]
+                hashes = {future.result() for future in futures}
+            if len(hashes) != 1:
+                raise RuntimeError(f"workers disagree about the state of {scene_name} play {play['index']}: {hashes}")
+
+            target = segment_path(segment_key(hashes.pop()))
+            if not target.exists():
+                temp_path = target.with_name(f"{target.stem}.{os.getpid()}.tmp{target.suffix}")
+                concat_movies(chunk_paths, temp_path)
+                os.replace(temp_path, target)
+                rendered.append(play["index"])
+            print(f"{scene_name} play {play['index']}: {len(ranges)} chunks -> {target.name}", flush=True)
+        except Exception:
+            # not fatal, the play just isn't in the segment store and the normal render draws it
+            log_error(scene_name, log_dir, f"play {play['index']}")
+        finally:
+            for path in chunk_paths + [temp_path]:
+                if path is not None:
+                    path.unlink(missing_ok=True)
+    return rendered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render the long plays of scenes on several cores.")
+    parser.add_argument("scenes", nargs="+", help="scene class names")
+    parser.add_argument("-q", "--quality", choices=animations.QUALITY_FLAGS, default="h")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="chunks per play (default: one per core)")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS, help="only split plays at least this long")
+    args = parser.parse_args(argv)
+
+    for name in args.scenes:
+        prerender_long_plays(name, animations.QUALITY_FLAGS[args.quality], args.jobs, args.min_seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
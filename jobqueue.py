@@ -0,0 +1,298 @@
+"""SQLite-backed render queue for long rebuilds (every scene, several qualities).
+
+A job is one scene at one quality, rendered to its usual place under
+media/videos/scene/<resolution>/. Jobs live in media/jobs.sqlite3, so the
+queue outlives the process that filled it:
+
+    python jobqueue.py add -q h -q m -q l         # every scene at 1080p60, 720p30 and 480p15
+    python jobqueue.py work -j 8                  # render until the queue is empty
+    python jobqueue.py status
+    python jobqueue.py retry                      # give the failed jobs another go
+
+``work`` claims jobs and renders each in a fresh worker process (the same
+animations.render_scene the batch renderer uses), at most -j at a time.
+Each render logs to media/logs/<resolution>/<Scene>.log, so the qualities
+of a scene don't overwrite each other's logs.
+While a job renders, its row gets a heartbeat every few seconds. A job
+whose heartbeat stops (the worker was killed, the machine rebooted) goes
+back to the queue, so just start ``work`` again after a crash. Several
+``work`` runs can share one queue, which is how more cores get used.
+
+A job is only marked done once its render has finished, and a finished
+job is never rendered again. Failed renders are retried up to
+MAX_ATTEMPTS times; scenes whose fingerprint shows they're already up to
+date are marked done without rendering (see fingerprints.py).
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import animations
+import fingerprints
+
+QUEUE_FILE = animations.MEDIA_DIR / "jobs.sqlite3"
+HEARTBEAT_SECONDS = 10
+# a running job nobody has touched for this long belongs to a dead worker
+STALE_SECONDS = 6 * HEARTBEAT_SECONDS
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    scene TEXT NOT NULL,
+    quality TEXT NOT NULL,
+    output TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, running, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    heartbeat REAL,
+    finished REAL,
+    seconds REAL,
+    log TEXT,
+    UNIQUE (scene, quality)
+)
+"""
+
+
+def connect(path=QUEUE_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # autocommit, transactions are started explicitly where they matter
+    connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(SCHEMA)
+    return connection
+
+
+def add_jobs(connection, names, qualities, force=False):
+    """Queues every scene in ``names`` at every quality. Returns how many jobs were added or reset."""
+    changed = 0
+    for quality in qualities:
+        output_dir = animations.video_dir(quality)
+        for name in names:
+            output = (output_dir / f"{name}.mp4").relative_to(animations.PROJECT_DIR).as_posix()
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO jobs (scene, quality, output) VALUES (?, ?, ?)", (name, quality, output)
+            )
+            if not cursor.rowcount and force:
+                cursor = connection.execute(
+                    "UPDATE jobs SET status = 'pending', attempts = 0 WHERE scene = ? AND quality = ? AND status != 'running'",
+                    (name, quality),
+                )
+            changed += cursor.rowcount
+    return changed
+
+
+def claim(connection, worker):
+    """Marks the next pending job as running by ``worker`` and returns it, or None if there is none."""
+    connection.execute("BEGIN IMMEDIATE")  # no other worker can claim in between
+    try:
+        # the dead worker's attempt counts too, or a scene that takes its machine down is retried forever
+        connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL"
+            " WHERE status = 'running' AND heartbeat < ?",
+            (MAX_ATTEMPTS, time.time() - STALE_SECONDS),
+        )
+        job = connection.execute(
+            "SELECT * FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if job is not None:
+            connection.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, time.time(), job["id"]),
+            )
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    return job
+
+
+def heartbeat(connection, job_ids, worker):
+    connection.executemany(
+        "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ?",
+        [(time.time(), job_id, worker) for job_id in job_ids],
+    )
+
+
+def finish(connection, job, result, worker):
+    """Records the result of a render (a dict from animations.render_scene)."""
+    if result["status"] == "ok":
+        status = "done"
+    else:
+        # claim() already counted this attempt
+        status = "pending" if job["attempts"] + 1 < MAX_ATTEMPTS else "failed"
+    # only if the job is still ours, a worker that was presumed dead mustn't overwrite a newer claim
+    connection.execute(
+        "UPDATE jobs SET status = ?, worker = NULL, finished = ?, seconds = ?, log = ? WHERE id = ? AND worker = ?",
+        (status, time.time(), result["seconds"], result["log"], job["id"], worker),
+    )
+
+
+def job_log_dir(job):
+    return animations.LOG_DIR / animations.video_dir(job["quality"]).name
+
+
+def release(connection, job, worker):
+    """Puts a claimed job back in the queue without counting the attempt."""
+    connection.execute(
+        "UPDATE jobs SET status = 'pending', worker = NULL, attempts = attempts - 1 WHERE id = ? AND worker = ?",
+        (job["id"], worker),
+    )
+
+
+def new_pool(jobs):
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    )
+
+
+def work(jobs=None, queue_file=QUEUE_FILE):
+    """Renders queued jobs, ``jobs`` at a time, until there are none left. Returns the number of failed renders.
+
+    A render process that dies (segfault, out of memory) takes the whole
+    pool down with it, and every job running at the time fails with
+    BrokenProcessPool, with no telling which one crashed. So those jobs go
+    back to the queue without losing an attempt, the pool is started
+    again, and until they have all been run again the jobs run one at a
+    time, where a crash can only be the job's own.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    scene_classes = {cls.__name__: cls for cls in animations.discover_scenes()}
+    connection = connect(queue_file)
+    failures = 0
+    running = {}  # future -> job
+    suspects = set()  # ids of the jobs that were running when the pool broke
+    pool = new_pool(jobs)
+    try:
+        while True:
+            if suspects:  # the ones that were claimed by another worker meanwhile aren't ours to isolate
+                pending = {row["id"] for row in connection.execute("SELECT id FROM jobs WHERE status = 'pending'")}
+                suspects &= pending | {job["id"] for job, _ in running.values()}
+            broken = False
+            while len(running) < (1 if suspects else jobs) and (job := claim(connection, worker)) is not None:
+                scene_class = scene_classes.get(job["scene"])
+                if scene_class is None:
+                    finish(connection, job, {"status": "unknown scene", "seconds": 0, "log": None}, worker)
+                    failures += 1
+                    continue
+                output_dir = animations.video_dir(job["quality"])
+                fingerprint = fingerprints.scene_fingerprint(scene_class, {"quality": job["quality"]})
+                if fingerprints.is_up_to_date(job["scene"], fingerprint, output_dir):
+                    finish(connection, job, {"status": "ok", "seconds": 0, "log": None}, worker)
+                    print(f"  {job['scene']:<24} {job['quality']:<18} up to date", flush=True)
+                    continue
+                try:
+                    future = pool.submit(animations.render_scene, job["scene"], job["quality"], job_log_dir(job))
+                except BrokenProcessPool:  # a running render just crashed, its future will say so
+                    release(connection, job, worker)
+                    broken = True
+                    break
+                running[future] = (job, fingerprint)
+            if not running:
+                if not broken:
+                    break
+                pool.shutdown()
+                pool = new_pool(jobs)
+                continue
+
+            done, _ = wait(running, timeout=HEARTBEAT_SECONDS, return_when=FIRST_COMPLETED)
+            heartbeat(connection, [job["id"] for future, (job, _) in running.items() if future not in done], worker)
+            if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                # the rest of the pool goes down too, collect all of it before deciding who to blame
+                done = wait(running).done
+            crashed = [future for future in done if isinstance(future.exception(), BrokenProcessPool)]
+            for future in done - set(crashed):
+                job, fingerprint = running.pop(future)
+                suspects.discard(job["id"])
+                try:
+                    result = future.result()
+                except Exception as error:  # the render process itself died
+                    result = {"status": f"crashed ({error.__class__.__name__})", "seconds": float("nan"),
+                              "log": str(job_log_dir(job) / f"{job['scene']}.log")}
+                if result["status"] == "ok":
+                    fingerprints.record_fingerprint(job["scene"], fingerprint, animations.video_dir(job["quality"]))
+                else:
+                    failures += 1
+                finish(connection, job, result, worker)
+                print(f"  {job['scene']:<24} {job['quality']:<18} {result['status']:<10} {result['seconds']:7.1f}s",
+                      flush=True)
+            if crashed:
+                if len(crashed) == 1:  # the only one the crash took down, so it's the one that crashed
+                    job, _ = running.pop(crashed[0])
+                    suspects.discard(job["id"])
+                    failures += 1
+                    log = str(job_log_dir(job) / f"{job['scene']}.log")
+                    finish(connection, job, {"status": "crashed", "seconds": float("nan"), "log": log}, worker)
+                    print(f"  {job['scene']:<24} {job['quality']:<18} crashed", flush=True)
+                else:
+                    for future in crashed:
+                        job, _ = running.pop(future)
+                        release(connection, job, worker)
+                        suspects.add(job["id"])
+                    print(f"  a render crashed, running the {len(crashed)} jobs it took down one at a time", flush=True)
+                pool.shutdown()
+                pool = new_pool(jobs)
+    finally:
+        pool.shutdown()
+        connection.close()
+    return failures
+
+
+def print_status(connection):
+    counts = dict(connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+    print(", ".join(f"{counts.get(status, 0)} {status}" for status in ["pending", "running", "done", "failed"]))
+    for job in connection.execute("SELECT * FROM jobs WHERE status IN ('running', 'failed') ORDER BY id"):
+        detail = f"on {job['worker']}" if job["status"] == "running" else f"after {job['attempts']} attempts, {job['log']}"
+        print(f"  {job['scene']:<24} {job['quality']:<18} {job['status']:<8} {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Queue scene renders in SQLite and work through them.")
+    parser.add_argument("--queue", default=QUEUE_FILE, help="queue database (default: media/jobs.sqlite3)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="queue scenes")
+    add.add_argument("scenes", nargs="*", help="scene class names (default: all of them)")
+    add.add_argument("-q", "--quality", choices=animations.QUALITY_FLAGS, action="append",
+                     help="quality, can be given several times (default: h)")
+    add.add_argument("--force", action="store_true", help="queue jobs that are already done or failed again")
+    run = commands.add_parser("work", help="render queued jobs until none are left")
+    run.add_argument("-j", "--jobs", type=int, default=None, help="renders at a time (default: one per core)")
+    commands.add_parser("status", help="show the queue")
+    commands.add_parser("retry", help="put the failed jobs back in the queue")
+    args = parser.parse_args(argv)
+
+    if args.command == "work":
+        return 1 if work(args.jobs, args.queue) else 0
+
+    connection = connect(args.queue)
+    if args.command == "add":
+        available = [cls.__name__ for cls in animations.discover_scenes()]
+        unknown = [name for name in args.scenes if name not in available]
+        if unknown:
+            parser.error(f"unknown scene(s): {', '.join(unknown)}")
+        qualities = [animations.QUALITY_FLAGS[flag] for flag in args.quality or ["h"]]
+        added = add_jobs(connection, args.scenes or available, qualities, args.force)
+        print(f"queued {added} job(s)")
+    elif args.command == "retry":
+        cursor = connection.execute("UPDATE jobs SET status = 'pending', attempts = 0 WHERE status = 'failed'")
+        print(f"requeued {cursor.rowcount} job(s)")
+    print_status(connection)
+    connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
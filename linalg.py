@@ -0,0 +1,101 @@
+"""The vector arithmetic behind the scenes, done by NumPy on whole batches at once.
+
+Every function takes vectors as arrays whose last axis holds the
+coordinates, so one vector is ``[2, 1, 0]``, a thousand of them a
+(1000, 3) array, and anything in between broadcasts the way NumPy does:
+
+    scale([2, 1, 0], 2)                 # one vector, one factor -> (3,)
+    scale([2, 1, 0], [-10, 10])         # one vector, two factors -> (2, 3), the ends of its span line
+    scale(field, lengths)               # (n, 3) vectors, (n,) factors -> (n, 3)
+    rotate(2 * LEFT, -angles)           # one vector, (n,) angles -> (n, 3)
+
+2D coordinates are padded to 3D (z = 0) on the way in, and everything
+comes out as float arrays manim takes as points. Results are the same
+numbers the scenes used to work out by hand, so the movies don't change.
+"""
+
+import numpy as np
+
+OUT = np.array([0.0, 0.0, 1.0])  # same as manim's OUT, the axis 2D rotations turn about
+
+
+def points(vectors):
+    """``vectors`` as a float array of 3D points, 2D ones padded with z = 0."""
+    vectors = np.asarray(vectors, dtype=float)
+    if vectors.shape[-1] == 3:
+        return vectors
+    if vectors.shape[-1] != 2:
+        raise ValueError(f"vectors need 2 or 3 coordinates, not {vectors.shape[-1]}")
+    return np.concatenate([vectors, np.zeros(vectors.shape[:-1] + (1,))], axis=-1)
+
+
+def dot(v, w):
+    """v . w for every pair, shape (...)."""
+    return np.einsum("...i,...i->...", points(v), points(w))
+
+
+def length(vectors):
+    return np.sqrt(dot(vectors, vectors))
+
+
+def scale(vectors, factors):
+    """Every vector times its factor (a scalar, or one factor per vector)."""
+    return np.asarray(factors, dtype=float)[..., None] * points(vectors)
+
+
+def linear_combination(coefficients, vectors):
+    """``coefficients[..., 0] * vectors[0] + coefficients[..., 1] * vectors[1] + ...``
+
+    ``vectors`` is the (k, 3) list of vectors combined, ``coefficients``
+    (..., k) gives one combination per row.
+    """
+    return np.asarray(coefficients, dtype=float) @ points(vectors)
+
+
+def project(vectors, onto):
+    """The projection of every vector onto ``onto`` (the "shadow" it casts on it)."""
+    onto = points(onto)
+    base = dot(onto, onto)
+    if np.any(base == 0):
+        raise ValueError("can't project onto the zero vector")
+    return (dot(vectors, onto) / base)[..., None] * onto
+
+
+def cross(v, w):
+    """v x w for every pair."""
+    return np.cross(points(v), points(w))
+
+
+def rotate(vectors, angles, axis=OUT):
+    """Every vector turned by its angle (radians, counterclockwise looking down ``axis``) about ``axis``.
+
+    Rodrigues' formula, so any axis works, not just z.
+    """
+    vectors = points(vectors)
+    axis = points(axis)
+    axis = axis / length(axis)[..., None]
+    angles = np.asarray(angles, dtype=float)[..., None]
+    cos, sin = np.cos(angles), np.sin(angles)
+    return (
+        vectors * cos
+        + cross(axis, vectors) * sin
+        + axis * dot(axis, vectors)[..., None] * (1 - cos)
+    )
+
+
+def span(basis, coefficients):
+    """Points of the span of ``basis``: every combination of the (k, 3) basis vectors with coefficients
+    taken from ``coefficients``, as a (len(coefficients) ** k, 3) array.
+
+    For one vector and ``[-10, 10]`` those are the ends of its span line, for two
+    and ``range(-5, 6)`` the corners of the grid they span.
+    """
+    basis = points(basis)
+    grid = np.meshgrid(*[np.asarray(coefficients, dtype=float)] * len(basis), indexing="ij")
+    return linear_combination(np.stack(grid, axis=-1).reshape(-1, len(basis)), basis)
+
+
+def parallelogram(v, w):
+    """Corners 0, v, v + w, w of the parallelogram v and w span, shape (..., 4, 3)."""
+    v, w = np.broadcast_arrays(points(v), points(w))
+    return np.stack([np.zeros_like(v), v, v + w, w], axis=-2)
@@ -0,0 +1,263 @@
+"""Reusable mobjects for the scenes in scene.py."""
+
+import copy
+import functools
+
+import numpy as np
+from manim import Mobject, NumberPlane, VMobject, config
+from manim.utils.bezier import get_smooth_cubic_bezier_handle_points
+
+# candidate samples per axes.plot sample when sampling adaptively, most of them get dropped again
+ADAPTIVE_OVERSAMPLING = 4
+
+
+def pixels_to_units(pixels):
+    """Length on screen in pixels -> length in scene units at the current render resolution."""
+    return pixels * config.frame_width / config.pixel_width
+
+
+def adaptive_sample_grid(x_min, x_max, step):
+    """Candidate x values for adaptive_mask: at least ``(x_max - x_min) / step`` intervals, 2**k of them."""
+    k = max(1, int(np.ceil(np.log2((x_max - x_min) / step))))
+    return np.linspace(x_min, x_max, 2**k + 1)
+
+
+def adaptive_mask(points, tolerance):
+    """Picks the samples of a curve worth keeping as anchors of a smooth bezier.
+
+    ``points`` are ``2**k + 1`` points along the graph of a function, x
+    increasing (see adaptive_sample_grid). Starting from the chord between
+    the two ends, an interval is halved as long as some of the points inside
+    it are more than ``tolerance`` (scene units) away from its chord. Flat
+    stretches end up with a handful of anchors, wiggly ones keep most of
+    theirs.
+
+    That bounds the polyline through the anchors, not the curve that gets
+    drawn: the smooth bezier manim fits through them (set_points_smoothly)
+    overshoots between anchors that are far apart, by up to several
+    times ``tolerance``. So the fitted bezier is checked against the samples
+    as well (its distance from the polyline through all of them, which is
+    as good as the true curve at this sampling), and intervals where it
+    strays further than 0.9 times ``tolerance`` are halved until it doesn't. The
+    bezier is only looked at in a few places per interval, the other tenth
+    is for what it does in between.
+
+    Every level of the halving and every round of checking is handled in one
+    go with NumPy.
+    """
+    num_points = len(points)
+    stride = num_points - 1
+    if stride < 2 or stride & (stride - 1):
+        raise ValueError(f"adaptive_mask needs 2**k + 1 points, got {num_points}")
+
+    keep = np.zeros(num_points, dtype=bool)
+    keep[[0, -1]] = True
+    split = np.array([True])  # intervals of the current level whose parent needed splitting
+    while stride >= 2:
+        starts = np.arange(0, num_points - 1, stride)
+        chord_start = points[starts, :2]
+        chord = points[starts + stride, :2] - chord_start
+        chord_length = np.linalg.norm(chord, axis=1)
+        chord_length[chord_length == 0] = 1
+        inner = points[starts[:, None] + np.arange(1, stride), :2] - chord_start[:, None]
+        # distance of every inner point from its interval's chord, via the 2d cross product
+        distance = np.abs(inner[..., 0] * chord[:, None, 1] - inner[..., 1] * chord[:, None, 0])
+        distance /= chord_length[:, None]
+
+        split &= distance.max(axis=1) > tolerance
+        keep[starts[split] + stride // 2] = True
+        split = np.repeat(split, 2)
+        stride //= 2
+
+    samples = np.arange(num_points)
+    spread = np.linspace(0, 1, 10)[1:-1]
+    while True:
+        anchor_indices = np.flatnonzero(keep)
+        anchors = points[anchor_indices]
+        handles_1, handles_2 = get_smooth_cubic_bezier_handle_points(anchors)
+        num_curves = len(anchors) - 1
+        # the spot of every sample on its bezier, plus a few evenly spread points on each one,
+        # which also catches the loops a bezier between neighbouring samples can make
+        sample_curve = np.minimum(np.searchsorted(anchor_indices, samples, side="right") - 1, num_curves - 1)
+        start, end = anchor_indices[sample_curve], anchor_indices[sample_curve + 1]
+        curve = np.concatenate([sample_curve, np.repeat(np.arange(num_curves), len(spread))])
+        t = np.concatenate([(samples - start) / (end - start), np.tile(spread, num_curves)])[:, None]
+        bezier = (
+            (1 - t) ** 3 * anchors[curve]
+            + 3 * (1 - t) ** 2 * t * handles_1[curve]
+            + 3 * (1 - t) * t**2 * handles_2[curve]
+            + t**3 * anchors[curve + 1]
+        )
+        # distance from the sample polyline, measured from the segment under each bezier point
+        segment = np.clip(np.searchsorted(points[:, 0], bezier[:, 0]) - 1, 0, num_points - 2)
+        x, y = points[segment, 0], points[segment, 1]
+        slope = (points[segment + 1, 1] - y) / (points[segment + 1, 0] - x)
+        distance = np.abs(bezier[:, 1] - y - slope * (bezier[:, 0] - x)) / np.sqrt(1 + slope**2)
+        strays = np.unique(curve[distance > 0.9 * tolerance])
+        # a bezier between neighbouring samples can't be halved, it's the long ones next to it
+        # that bend it out of shape
+        short = anchor_indices[strays + 1] - anchor_indices[strays] < 2
+        strays = np.unique(np.concatenate([strays[~short], strays[short] - 1, strays[short] + 1]))
+        strays = strays[(strays >= 0) & (strays < len(anchors) - 1)]
+        strays = strays[anchor_indices[strays + 1] - anchor_indices[strays] >= 2]
+        if not len(strays):
+            return keep
+        keep[(anchor_indices[strays] + anchor_indices[strays + 1]) // 2] = True
+
+
+def adaptive_plot(axes, function, x_range=None, tolerance=0.5, **kwargs):
+    """Like ``axes.plot(function)``, with anchors placed by curvature instead of evenly.
+
+    ``tolerance`` is how far (in pixels at the render resolution) the curve
+    may stray from the function. ``function`` has to work on NumPy arrays.
+    """
+    x_min, x_max = x_range[:2] if x_range is not None else axes.x_range[:2]
+    step = axes.x_range[2] / axes.num_sampled_graph_points_per_tick / ADAPTIVE_OVERSAMPLING
+    x_values = adaptive_sample_grid(x_min, x_max, step)
+    points = axes.coords_to_point(np.column_stack([x_values, function(x_values)]))
+    graph = VMobject(**kwargs)
+    graph.set_points_smoothly(points[adaptive_mask(points, pixels_to_units(tolerance))])
+    return graph
+
+
+class SharedNumberPlane(NumberPlane):
+    """NumberPlane whose copies share their point arrays until one of them is moved.
+
+    Shared arrays are marked read-only. The transforms manim does in place
+    (scale, rotate, apply_matrix, ... all go through
+    Mobject.apply_points_function_about_point) give read-only arrays private
+    copies first, see _own_points_first below, so that also works on a
+    VGroup the plane is part of; everything else in manim assigns new
+    arrays anyway. Call own_points() yourself before writing into the
+    points of one of its lines directly.
+    """
+
+    def copy(self):
+        family = self.family_members_with_points()
+        for mob in family:
+            mob.points.flags.writeable = False
+        # deepcopy everything except the point arrays, which the copy reuses as they are
+        return copy.deepcopy(self, {id(mob.points): mob.points for mob in family})
+
+    def own_points(self):
+        for mob in self.family_members_with_points():
+            if not mob.points.flags.writeable:
+                mob.points = mob.points.copy()
+        return self
+
+
+def _own_points_first(apply_points_function_about_point):
+    # an in-place transform of any group walks the whole family itself (mob.points -= ...), the
+    # plane's lines are plain Lines, so copy-on-write has to sit in Mobject's method, not in ours
+    @functools.wraps(apply_points_function_about_point)
+    def wrapper(self, *args, **kwargs):
+        for mob in self.family_members_with_points():
+            if not mob.points.flags.writeable:
+                mob.points = mob.points.copy()
+        return apply_points_function_about_point(self, *args, **kwargs)
+
+    return wrapper
+
+
+if not hasattr(Mobject.apply_points_function_about_point, "__wrapped__"):
+    Mobject.apply_points_function_about_point = _own_points_first(
+        Mobject.apply_points_function_about_point
+    )
+
+
+_plane_cache = {}
+
+
+def _freeze(value):
+    """Hashable stand-in for a NumberPlane argument (style dicts, ranges, colors)."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def number_plane(**kwargs):
+    """``NumberPlane(**kwargs)``, built once per process per set of arguments.
+
+    Every call returns a copy of the cached plane that shares its point data
+    with it (see SharedNumberPlane), so handing the same grid to several
+    scenes costs a deepcopy of the mobject tree instead of a full NumberPlane
+    construction each time.
+    """
+    # the default ranges come from the frame size, keep planes for different frames apart
+    key = (config.frame_width, config.frame_height, _freeze(kwargs))
+    if key not in _plane_cache:
+        _plane_cache[key] = SharedNumberPlane(**kwargs)
+    return _plane_cache[key].copy()
+
+
+class WavePlot(VMobject):
+    """A graph of ``psi(x, t)`` on ``axes`` that follows ``t_tracker`` every frame.
+
+    Drop-in replacement for
+
+        always_redraw(lambda: axes.plot(lambda x: psi(x, t_tracker.get_value())))
+
+    without rebuilding a ParametricFunction (and calling psi once per sample
+    point) on every frame. The x samples are fixed when the plot is created,
+    and each frame evaluates ``psi`` once on the whole sample array and
+    writes the new curve into the existing points array.
+
+    ``psi`` must work on NumPy arrays. It can return one curve, shape
+    ``(len(x),)``, or several at once, shape ``(k, len(x))``, e.g. a few
+    wave packets that should all be drawn in the same style.
+
+    With ``tolerance`` (in pixels) the anchors are picked again every frame
+    with adaptive_mask, so they follow the moving parts of the curve and the
+    flat parts only get a few. ``num_samples`` is ignored then.
+    """
+
+    def __init__(self, axes, psi, t_tracker, x_range=None, num_samples=None, tolerance=None, **kwargs):
+        super().__init__(**kwargs)
+        self.axes = axes
+        self.psi = psi
+        self.t_tracker = t_tracker
+        self.tolerance = tolerance
+
+        # same sampling axes.plot would use unless told otherwise: ten points per axis tick
+        x_min, x_max = x_range[:2] if x_range is not None else axes.x_range[:2]
+        step = axes.x_range[2] / axes.num_sampled_graph_points_per_tick
+        if tolerance is not None:
+            self.x_values = adaptive_sample_grid(x_min, x_max, step / ADAPTIVE_OVERSAMPLING)
+        else:
+            if num_samples is None:
+                num_samples = int(np.ceil((x_max - x_min) / step)) + 1
+            self.x_values = np.linspace(x_min, x_max, num_samples)
+
+        self.update_curve()
+        self.add_updater(lambda mob: mob.update_curve())
+
+    def update_curve(self):
+        nppcc = self.n_points_per_cubic_curve
+        curves = np.atleast_2d(self.psi(self.x_values, self.t_tracker.get_value()))
+        all_anchors = [self.axes.coords_to_point(np.column_stack([self.x_values, y_values])) for y_values in curves]
+        if self.tolerance is not None:
+            tolerance = pixels_to_units(self.tolerance)
+            all_anchors = [anchors[adaptive_mask(anchors, tolerance)] for anchors in all_anchors]
+
+        num_points = sum(nppcc * (len(anchors) - 1) for anchors in all_anchors)
+        if self.points.shape != (num_points, 3):
+            # first frame, psi changed how many curves it returns, or the adaptive anchors changed
+            self.points = np.zeros((num_points, 3))
+
+        start = 0
+        for anchors in all_anchors:
+            handles_1, handles_2 = get_smooth_cubic_bezier_handle_points(anchors)
+            # each curve is its own subpath: anchor, handle, handle, anchor, ...
+            subpath = self.points[start:start + nppcc * (len(anchors) - 1)]
+            start += len(subpath)
+            subpath[0::nppcc] = anchors[:-1]
+            subpath[1::nppcc] = handles_1
+            subpath[2::nppcc] = handles_2
+            subpath[3::nppcc] = anchors[1:]
+        return self
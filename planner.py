@@ -0,0 +1,145 @@
+"""Dry-run planner: the timeline of every scene without rendering a frame.
+
+Runs construct() of each scene with every play skipped (frame_parallel's
+ProbeRenderer: no rasterizing, no encoding, no files) and writes out, per
+play()/wait() segment, when it starts, how long it is, how many frames it
+turns into, what keeps it from being a frozen frame (updaters like
+QuantumWave's wave packet, camera motion like CrossProductMagic's ambient
+rotation) and a rough rasterization cost.
+
+    python planner.py                      # every scene, JSON on stdout
+    python planner.py -o plan.json         # to a file
+    python planner.py -q l DotProduct      # just one scene, at 480p15
+
+The cost is in "point frames": bezier points that have to be drawn, summed
+over all rasterized frames (a frozen wait counts once, the static background
+once per play). It only compares segments and scenes with each other; the
+batch renderer uses it to start the most expensive scenes first
+(``animations.py --plan plan.json``).
+"""
+
+import argparse
+import json
+import sys
+import traceback
+
+from manim import config
+
+import animations
+from frame_parallel import ProbeRenderer, frame_count
+
+
+def _points(mobjects):
+    return int(sum(len(mob.points) for mob in mobjects))
+
+
+def _camera_mobjects(camera):
+    if hasattr(camera, "get_value_trackers"):  # ThreeDCamera
+        return [*camera.get_value_trackers(), camera._frame_center]
+    if hasattr(camera, "frame"):  # MovingCamera
+        return [camera.frame]
+    return []
+
+
+class PlanRenderer(ProbeRenderer):
+    def describe_play(self, scene, play):
+        fps = config["frame_rate"]
+        if play["static_wait"]:
+            # what freeze_current_frame writes: one rasterized frame, repeated
+            frames = int(play["duration"] / (1 / fps))
+            rasterized = 1
+        else:
+            frames = rasterized = frame_count(play["duration"], fps)
+
+        # only what this play's animations drive, plus updaters (ambient rotation): get_moving_mobjects
+        # returns everything from the first moving mobject on, trackers of an earlier move_camera too
+        animated = {id(mob) for anim in scene.animations for mob in anim.mobject.get_family()}
+        camera_mobjects = _camera_mobjects(self.camera)
+        camera_motion = any(
+            id(mob) in animated or mob.get_family_updaters() for mob in camera_mobjects
+        )
+        updaters = [
+            str(mob) for mob in scene.mobjects
+            if mob.get_family_updaters() and mob not in camera_mobjects
+        ]
+        moving_points = _points(scene.moving_mobjects)
+        static_points = _points(scene.static_mobjects)
+
+        play.pop("hash")
+        play.update({
+            "start": self.time,
+            "frames": frames,
+            "updaters": updaters + ["scene updaters"] * bool(scene.updaters),
+            "camera_motion": camera_motion,
+            "moving_points": moving_points,
+            "static_points": static_points,
+            "cost": static_points + rasterized * moving_points,
+        })
+        return play
+
+
+def plan_scene(name, scene_class):
+    """Timeline of one scene (already configured, see animations.configure_manim)."""
+    scene = animations.build_scene(scene_class, renderer_class=PlanRenderer)
+    scene.render()
+    segments = scene.renderer.plays
+    return {
+        "scene": name,
+        "duration": sum(segment["duration"] for segment in segments),
+        "frames": sum(segment["frames"] for segment in segments),
+        "plays": sum(not segment["static_wait"] for segment in segments),
+        "frozen_waits": sum(segment["static_wait"] for segment in segments),
+        "cost": sum(segment["cost"] for segment in segments),
+        "segments": segments,
+    }
+
+
+def plan(names=None, quality="high_quality"):
+    scene_classes = {cls.__name__: cls for cls in animations.discover_scenes()}
+    animations.configure_manim(quality)
+    config.verbosity = "WARNING"  # keep manim's per-play log lines out of the JSON on stdout
+    scenes = []
+    for name in names or scene_classes:
+        try:
+            scenes.append(plan_scene(name, scene_classes[name]))
+        except Exception:
+            scenes.append({"scene": name, "error": traceback.format_exc()})
+    return {
+        "quality": quality,
+        "resolution": f"{config.pixel_width}x{config.pixel_height}",
+        "frame_rate": config["frame_rate"],
+        "scenes": scenes,
+    }
+
+
+def scene_costs(plan_file):
+    """``{scene: cost}`` from a plan written by this module; failed scenes are left out."""
+    with open(plan_file, encoding="utf-8") as fp:
+        scenes = json.load(fp)["scenes"]
+    return {scene["scene"]: scene["cost"] for scene in scenes if "cost" in scene}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the timeline of the scenes without rendering them.")
+    parser.add_argument("scenes", nargs="*", help="scene class names (default: all of them)")
+    parser.add_argument("-q", "--quality", choices=animations.QUALITY_FLAGS, default="h")
+    parser.add_argument("-o", "--output", default=None, help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    result = plan(args.scenes, animations.QUALITY_FLAGS[args.quality])
+    text = json.dumps(result, indent=4)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+        for scene in result["scenes"]:
+            if "error" in scene:
+                print(f"{scene['scene']:<24} failed", file=sys.stderr)
+            else:
+                print(f"{scene['scene']:<24} {scene['duration']:7.1f}s {scene['frames']:6} frames  cost {scene['cost']:.3g}")
+    return 0 if all("error" not in scene for scene in result["scenes"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""The numbers and LaTeX behind the worked examples in scene.py.
+
+DefineBasis, DotProduct and CrossProductMagic take their vectors from
+class attributes (``v``, ``w``) and get everything derived from them here:
+the results, the points to draw and the strings to show. variants.py uses
+that to render the same scene for a whole table of other vectors.
+"""
+
+import numpy as np
+
+import linalg
+
+
+def fmt(x):
+    """A number as it should appear on screen: 6, -2, 1.41 (at most two decimals)."""
+    text = f"{float(x):.2f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def point(coords):
+    """2D or 3D coordinates as a 3D point for manim."""
+    return linalg.points(coords)
+
+
+def column_tex(name, coords):
+    r"""``\vec{v} = \begin{bmatrix} 3 \\ 0 \end{bmatrix}``"""
+    rows = r" \\ ".join(fmt(c) for c in coords)
+    return rf"\vec{{{name}}} = \begin{{bmatrix}} {rows} \end{{bmatrix}}"
+
+
+def basis_problem(v):
+    """DefineBasis: v as a linear combination of i-hat and j-hat."""
+    x, y = v
+    if x == 0 or y == 0:
+        raise ValueError(f"v = {v}: both components have to be non-zero to draw the walk along i and j")
+    sign = "+" if y > 0 else "-"
+    return {
+        "x": float(x),
+        "y": float(y),
+        "v": point(v),
+        "label": rf"\vec{{v}} = {fmt(x)}\hat{{i}} {sign} {fmt(abs(y))}\hat{{j}}",
+    }
+
+
+def dot_product_problem(v, w):
+    """DotProduct: v . w, worked out by components and as base length times shadow length.
+
+    For an obtuse angle between v and w the shadow falls behind the origin.
+    Its length is still shown positive, with the text saying it points
+    against v and the product getting a minus sign.
+    """
+    v, w = point(v), point(w)
+    dot = float(linalg.dot(v, w))
+    base = float(linalg.length(v))
+    if base == 0:
+        raise ValueError("v can't be the zero vector, it's what w casts its shadow on")
+    shadow = dot / base  # signed length of w's projection onto v
+    if abs(shadow) < 1e-9:
+        raise ValueError(f"v = {v[:2]} and w = {w[:2]} are perpendicular, the shadow has no length to draw")
+    angle = float(np.degrees(np.arccos(np.clip(dot / (base * float(linalg.length(w))), -1, 1))))
+    if shadow > 0:
+        shadow_text = f"Shadow (Length {fmt(shadow)})"
+        geo = rf"{fmt(base)} \times {fmt(shadow)} = {fmt(dot)}"
+    else:
+        shadow_text = f"Shadow (Length {fmt(-shadow)}, against v: {fmt(angle)}° apart)"
+        geo = rf"-({fmt(base)} \times {fmt(-shadow)}) = {fmt(dot)}"
+    return {
+        "v": v,
+        "w": w,
+        "dot": dot,
+        "projection": linalg.project(w, v),
+        "shadow": shadow,
+        "angle": angle,  # between v and w, in degrees
+        "label_v": column_tex("v", v[:2]),
+        "label_w": column_tex("w", w[:2]),
+        "calc": rf"= ({fmt(v[0])})({fmt(w[0])}) + ({fmt(v[1])})({fmt(w[1])}) = {fmt(dot)}",
+        "shadow_text": shadow_text,
+        "geo": geo,
+    }
+
+
+def cross_product_problem(v, w):
+    """CrossProductMagic: v x w for v and w in the x-y plane, so the result points along z."""
+    v, w = point(v), point(w)
+    if v[2] or w[2]:
+        raise ValueError("v and w have to lie in the x-y plane (z = 0), the parallelogram is drawn there")
+    cross = linalg.cross(v, w)
+    if not cross[2]:
+        raise ValueError(f"v = {v[:2]} and w = {w[:2]} are parallel, their cross product is zero")
+    area = f"({fmt(v[0])})({fmt(w[1])}) - ({fmt(v[1])})({fmt(w[0])})"
+    if cross[2] < 0:
+        area = f"|{area}|"  # pointing down, the length is still positive
+    return {
+        "v": v,
+        "w": w,
+        "cross": cross,
+        "parallelogram": linalg.parallelogram(v, w),
+        "calc": [
+            rf"\vec{{v}} &= \langle {', '.join(fmt(c) for c in v)} \rangle \\",
+            rf"\vec{{w}} &= \langle {', '.join(fmt(c) for c in w)} \rangle \\",
+            rf"|\vec{{v}} \times \vec{{w}}| &= {area} \\",
+            rf"&= {fmt(abs(cross[2]))}",
+        ],
+    }
+
+
+def label_position(coords, offset=0.2):
+    """Just past the tip of the vector to ``coords``, pushed out along its main axis, for its label."""
+    coords = point(coords)
+    axis = np.argmax(np.abs(coords))
+    position = coords.copy()
+    position[axis] += offset * np.sign(coords[axis])
+    return position
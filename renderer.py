@@ -0,0 +1,110 @@
+"""The CairoRenderer used by the batch renderer.
+
+At the start of every play() manim rasterizes everything that doesn't move
+during it (the static mobjects) into a background image once, and each
+frame of the play only draws the moving mobjects on top of a copy of that
+image. The background itself is thrown away after the play though, so a
+scene like DotProduct, whose NumberPlane is added once and never touched
+again, re-strokes the whole grid at the start of every one of its plays.
+
+LayeredRenderer keeps the last background around together with a snapshot
+of what it was drawn from. The next play reuses it as long as the mobjects
+that went into it are still the bottom of the static stack and look exactly
+the same, and only draws the mobjects that have become static since (the
+arrow that just finished growing, ...) on top of it. Under a ThreeDCamera,
+which sorts 3D surfaces by depth and draws everything else last, that only
+happens while the new mobjects still come after the layer's in its order.
+"""
+
+import numpy as np
+from manim import CairoRenderer, ManimColor
+
+
+def mobject_state(mobject):
+    """Everything about ``mobject`` itself (not its submobjects) that can change how it's drawn.
+
+    Arrays (points, rgbas, sheen direction, an image's pixels, ...) and plain
+    values are compared, other mobjects and callables hanging off it are not.
+    """
+    state = [id(mobject), type(mobject)]
+    for key, value in vars(mobject).items():
+        if isinstance(value, np.ndarray):
+            state.append((key, value.dtype.str, value.shape, value.tobytes()))
+        elif value is None or isinstance(value, (bool, int, float, str)):
+            state.append((key, value))
+        elif isinstance(value, ManimColor):
+            state.append((key, repr(value)))
+    return tuple(state)
+
+
+class LayeredRenderer(CairoRenderer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.static_layer = None  # (camera state, [mobject_state, ...], image)
+
+    def camera_state(self):
+        camera = self.camera
+        state = [
+            np.asarray(camera.frame_center, dtype=float).tobytes(),
+            camera.frame_width,
+            camera.frame_height,
+            repr(camera.background_color),
+            camera.background_opacity,
+        ]
+        # ThreeDCamera keeps its orientation in value trackers
+        for getter in ["get_phi", "get_theta", "get_gamma", "get_focal_distance", "get_zoom"]:
+            if hasattr(camera, getter):
+                state.append(float(getattr(camera, getter)()))
+        # and draws these differently from everything else
+        for name in ["fixed_in_frame_mobjects", "fixed_orientation_mobjects"]:
+            if hasattr(camera, name):
+                state.append(tuple(sorted(id(mob) for mob in getattr(camera, name))))
+        return tuple(state)
+
+    def lend_pixel_array(self):
+        # draw into one of the writer's frame buffers (see writer.SceneWriter), which
+        # then goes to the encoder as it is instead of being copied out of the camera
+        if hasattr(self.file_writer, "lend_buffer"):
+            pixel_array = self.camera.pixel_array
+            self.camera.pixel_array = self.file_writer.lend_buffer(pixel_array.shape, pixel_array.dtype)
+
+    def update_frame(self, *args, **kwargs):
+        self.lend_pixel_array()
+        super().update_frame(*args, **kwargs)
+
+    def render(self, scene, time, moving_mobjects):
+        self.update_frame(scene, moving_mobjects)
+        lending = hasattr(self.file_writer, "lend_buffer")
+        self.add_frame(self.camera.pixel_array if lending else self.get_frame())
+
+    def save_static_frame_data(self, scene, static_mobjects):
+        if not static_mobjects:
+            return super().save_static_frame_data(scene, static_mobjects)
+
+        # static_mobjects is the flat list of everything with points, in drawing order
+        camera_state = self.camera_state()
+        states = [mobject_state(mob) for mob in static_mobjects]
+        reused = 0
+        if self.static_layer is not None:
+            layer_camera_state, layer_states, layer_image = self.static_layer
+            if camera_state == layer_camera_state and states[:len(layer_states)] == layer_states:
+                reused = len(layer_states)
+        if 0 < reused < len(states):
+            # ThreeDCamera draws the 3D surfaces sorted by depth and everything else after them,
+            # so what became static since may belong underneath the layer
+            order = self.camera.get_mobjects_to_display(static_mobjects, include_submobjects=False)
+            if any(drawn is not mob for drawn, mob in zip(order[:reused], static_mobjects[:reused])):
+                reused = 0
+
+        if reused == 0:
+            super().save_static_frame_data(scene, static_mobjects)
+        elif reused == len(states):
+            self.static_image = layer_image
+        else:
+            # the old background with whatever became static since drawn over it
+            self.lend_pixel_array()
+            self.camera.set_frame_to_background(layer_image)
+            self.camera.capture_mobjects(static_mobjects[reused:], include_submobjects=False)
+            self.static_image = self.get_frame()
+        self.static_layer = (camera_state, states, self.static_image)
+        return self.static_image
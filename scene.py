@@ -1,13 +1,19 @@
 from manim import *
 import numpy as np
 
+import linalg # the vector arithmetic, done by numpy for whole batches of vectors
+from mobjects import WavePlot, number_plane
+from problems import basis_problem, cross_product_problem, dot_product_problem, label_position
+from snapshots import snapshot
+from text_cache import CachedText as Text # same Text, but the parsed glyphs are kept on disk between runs
+
 class GeometricVectorScene(Scene):
     def construct(self):
         
         geom_title = Tex("Geometric Vector").to_edge(UP) # Adds a title
 
         # Creates the coordinate system
-        axes = NumberPlane(
+        axes = number_plane(
             x_range=[-3, 3, 1],  #Specifies x-axis range
             y_range=[-3, 3, 1],  # y-axis range
             x_length=7,          # Visual width of the plane
@@ -59,7 +65,7 @@ class GeometricVectorScene(Scene):
 class VectorTransformations(Scene):
     def construct(self):
         # create coordinate plane
-        plane = NumberPlane(
+        plane = number_plane(
             x_range=[-6, 6, 1],
             y_range=[-5, 5, 1],
             background_line_style={
@@ -164,7 +170,7 @@ class NumericalVectorScene(Scene):
 
 class PlotVectors(Scene):
         def construct(self):
-            axes = NumberPlane(
+            axes = number_plane(
                   axis_config={"color": WHITE}, #sets basis to white
             background_line_style={ #alters background (color and stroke width)
                 "stroke_color": TEAL,
@@ -230,7 +236,7 @@ class SuperpositionPrinciples(Scene):
 class VectorScalingAndSpace(Scene):
     def construct(self):
         # Setup Plane
-        plane = NumberPlane(
+        plane = number_plane(
             background_line_style={#all of these parameters control the aesthetics of the plane
                 "stroke_color": TEAL,
                 "stroke_width": 2,
@@ -249,7 +255,7 @@ class VectorScalingAndSpace(Scene):
 
         # Demonstrate Scalar Multiplication 
         scale_factor = 2   # Scale by 2
-        scaled_v = Vector([x * scale_factor for x in v_coords], color=YELLOW) #new sclaed vector
+        scaled_v = Vector(linalg.scale(v_coords, scale_factor), color=YELLOW) #new sclaed vector
         scale_label = MathTex(r"2 \cdot \vec{v}").next_to(scaled_v.get_end(), RIGHT + UP)
         
         self.play(
@@ -260,7 +266,7 @@ class VectorScalingAndSpace(Scene):
 
         # Scale by -1.5 (showing direction change)
         scale_factor_neg = -1.5
-        neg_v = Vector([x * scale_factor_neg for x in v_coords], color=RED)
+        neg_v = Vector(linalg.scale(v_coords, scale_factor_neg), color=RED)
         neg_label = MathTex(r"-1.5 \cdot \vec{v}").next_to(neg_v.get_end(), LEFT + DOWN) #text next to vector
         
         self.play(
@@ -271,7 +277,8 @@ class VectorScalingAndSpace(Scene):
 
         # Show the Span of a Single Vector 
         # Explain that all scalings of v create a line
-        span_line = Line(start=np.array(v_coords)*-10, end=np.array(v_coords)*10, color=YELLOW_A) #i use numpy to easily scale the coordinates of my vector, giving the illusion of a line spanning the screen
+        span_start, span_end = linalg.scale(v_coords, [-10, 10]) # scaling v way past the edges of the screen gives the illusion of a line spanning the screen
+        span_line = Line(start=span_start, end=span_end, color=YELLOW_A)
         span_text = Text("Span of one vector is a line", font_size=24).to_corner(UL)
         
         self.play(Create(span_line), Write(span_text))
@@ -286,8 +293,9 @@ class VectorScalingAndSpace(Scene):
         )
         
         # Define two basis vectors (linearly independent)
-        v1 = Vector([2, 1, 0], color=GREEN) # original v
-        v2 = Vector([-1, 2, 0], color=BLUE) # new vector w
+        w_coords = [-1, 2, 0]
+        v1 = Vector(v_coords, color=GREEN) # original v
+        v2 = Vector(w_coords, color=BLUE) # new vector w
         
         #labels
         v1_label = MathTex(r"\vec{v}").next_to(v1.get_end(), RIGHT) #get end returns the position of the vectors head
@@ -301,10 +309,10 @@ class VectorScalingAndSpace(Scene):
         b = 1
         
         # animate/visualize the components
-        comp1 = Vector([2 * a, 1 * a, 0], color=GREEN_A).set_opacity(0.6)
-        comp2 = Vector([-1 * b, 2 * b, 0], color=BLUE_A).set_opacity(0.6).shift(comp1.get_end())
+        comp1 = Vector(linalg.scale(v_coords, a), color=GREEN_A).set_opacity(0.6)
+        comp2 = Vector(linalg.scale(w_coords, b), color=BLUE_A).set_opacity(0.6).shift(comp1.get_end())
         
-        combo_vector = Vector(comp1.get_end() + comp2.get_end() - comp1.get_end(), color=PURPLE)
+        combo_vector = Vector(linalg.linear_combination([a, b], [v_coords, w_coords]), color=PURPLE)
         combo_label = MathTex(r"2\vec{v} + 1\vec{w}").next_to(combo_vector.get_end(), UP)
 
         self.play(TransformFromCopy(v1, comp1))
@@ -328,9 +336,12 @@ class VectorScalingAndSpace(Scene):
 
 
 class DefineBasis(Scene):
+    # the vector built from i and j, variants.py renders this scene with other ones
+    v = [3, 2]
+
     def construct(self):
         # create coord plane MObject
-        plane = NumberPlane(
+        plane = number_plane(
             background_line_style={
                 "stroke_color": TEAL,
                 "stroke_width": 2,
@@ -356,12 +367,13 @@ class DefineBasis(Scene):
 
         #constructing a vector with coordinates
         # show that vector v = [3, 2] is built from 3*i and 2*j
-        x_val = 3
-        y_val = 2
-        v_values = [x_val, y_val, 0]
+        problem = basis_problem(self.v)
+        x_val = problem["x"]
+        y_val = problem["y"]
+        v_values = problem["v"]
         
         v = Vector(v_values, color=YELLOW)
-        v_label = MathTex(r"\vec{v} = 3\hat{i} + 2\hat{j}").next_to(v.get_end(), RIGHT)
+        v_label = MathTex(problem["label"]).next_to(v.get_end(), RIGHT)
         
         # Visualizing the "walk" (Linear Combination components)
         # Component along X (scaled i_hat)
@@ -396,9 +408,14 @@ class DefineBasis(Scene):
 
 
 class DotProduct(Scene):
+    # v along x-axis to make the projection (shadow) easy to see
+    # (variants.py renders this scene with other v and w)
+    v = [3, 0]
+    w = [2, 2]
+
     def construct(self):
         # creating the coord plane
-        plane = NumberPlane(
+        plane = number_plane(
             x_range=[-6, 6, 1],
             y_range=[-5, 5, 1],
             background_line_style={
@@ -417,15 +434,16 @@ class DotProduct(Scene):
         self.play(FadeOut(title_dot))
 
         # Define vectors for Dot Product 
-        # v along x-axis to make the projection (shadow) easy to see
-        v_coords = [3, 0, 0]
-        w_coords = [2, 2, 0] 
+        # every number and formula below is worked out from v and w in problems.py
+        problem = dot_product_problem(self.v, self.w)
+        v_coords = problem["v"]
+        w_coords = problem["w"]
         
         arrow_v = Arrow(ORIGIN, v_coords, color=RED, buff=0)
-        label_v = MathTex(r"\vec{v} = \begin{bmatrix} 3 \\ 0 \end{bmatrix}", color=RED).next_to(arrow_v, DOWN)
+        label_v = MathTex(problem["label_v"], color=RED).next_to(arrow_v, DOWN)
         
         arrow_w = Arrow(ORIGIN, w_coords, color=BLUE, buff=0)
-        label_w = MathTex(r"\vec{w} = \begin{bmatrix} 2 \\ 2 \end{bmatrix}", color=BLUE).next_to(arrow_w, UP)
+        label_w = MathTex(problem["label_w"], color=BLUE).next_to(arrow_w, UP)
         
         self.play(GrowArrow(arrow_v), Write(label_v))
         self.play(GrowArrow(arrow_w), Write(label_w))
@@ -439,7 +457,7 @@ class DotProduct(Scene):
         
         # Plugging in numbers from the chosen example vectors
         calc_example = MathTex(
-            r"= (3)(2) + (0)(2) = 6",
+            problem["calc"],
             font_size=32
         ).next_to(calc_text, DOWN, aligned_edge=LEFT)
         
@@ -449,12 +467,12 @@ class DotProduct(Scene):
         
         # Geometric Interpretation (Projection)
         # Draw a dashed line dropping from w to v to show the "shadow"
-        proj_point = [2, 0, 0]
+        proj_point = problem["projection"]
         dashed_line = DashedLine(start=w_coords, end=proj_point, color=YELLOW) #dashed line Mobject
         
         # The "Shadow" vector (Projection)
         shadow_arrow = Arrow(ORIGIN, proj_point, color=YELLOW, buff=0, stroke_width=6)
-        label_shadow = Text("Shadow (Length 2)", font_size=20, color=YELLOW).next_to(shadow_arrow, UP, buff=0.1)
+        label_shadow = Text(problem["shadow_text"], font_size=20, color=YELLOW).next_to(shadow_arrow, UP, buff=0.1)
         
         self.play(Create(dashed_line))
         self.play(GrowArrow(shadow_arrow), FadeIn(label_shadow))
@@ -463,7 +481,7 @@ class DotProduct(Scene):
         geo_text = Text("Dot Product = (Length of Base) * (Length of Shadow)", font_size=24, color=YELLOW)
         geo_text.next_to(calc_example, DOWN, buff=0.5, aligned_edge=LEFT)
         
-        geo_math = MathTex(r"3 \times 2 = 6", font_size=32, color=YELLOW)
+        geo_math = MathTex(problem["geo"], font_size=32, color=YELLOW)
         geo_math.next_to(geo_text, DOWN, aligned_edge=LEFT)
         
         self.play(Write(geo_text))
@@ -541,7 +559,7 @@ class WorkIntegral(Scene):
 
         # Prints the vector form of the work integral
         # W = integral F dot dr
-        equation_vector = MathTex(#each element of the equation vector can be referenced as an array element
+        equation_vector = snapshot(MathTex, #each element of the equation vector can be referenced as an array element
             r"W",                              # 0
             r"=",                              # 1
             r"\int",                           # 2
@@ -555,7 +573,7 @@ class WorkIntegral(Scene):
 
         # 3. The Scalar/Cosine Form
         # W = integral |F| |dr| cos(theta)
-        equation_expanded = MathTex(
+        equation_expanded = snapshot(MathTex,
             r"W",                                      # 0
             r"=",                                      # 1
             r"\int",                                   # 2
@@ -607,11 +625,8 @@ class WorkIntegral(Scene):
             # Calculate start point relative to box based on angle
             force_len = 2.0
             # A vector pointing towards the box center from the left/top
-            start_offset = [
-                -force_len * np.cos(angle_rad), 
-                force_len * np.sin(angle_rad), 
-                0
-            ]
+            # (a force_len long vector pointing left, turned clockwise by the angle)
+            start_offset = linalg.rotate(linalg.scale(LEFT, force_len), -angle_rad)
             
             # Arrow ends at box center
             arrow_end = box.get_center()
@@ -689,8 +704,13 @@ class WorkIntegral(Scene):
 
 
 class CrossProductMagic(ThreeDScene): #ThreeDScene has different functions and Mobjects than a normal manim Scene
+    # I chose vectors in the x-y plane so that it can be visually clear when I take the cross product in 3d
+    # (variants.py renders this scene with other ones)
+    v = [2, 0, 0]
+    w = [1, 2, 0]
+
     def construct(self):
-        axes = ThreeDAxes(
+        axes = snapshot(ThreeDAxes, # built once, loaded from media/snapshots/ in later runs
             x_range=[-4, 4, 1],
             y_range=[-4, 4, 1],
             z_range=[-4, 4, 1],
@@ -707,18 +727,17 @@ class CrossProductMagic(ThreeDScene): #ThreeDScene has different functions and M
 
         # --- DEFINING VECTORS ---
         
-        # I chose vectors in the x-y plane so that it can be visually clear when I take the cross product in 3d
-        # v = [2, 0, 0] (Red)
-        # w = [1, 2, 0] (Blue)
-        v_coords = [2, 0, 0]
-        w_coords = [1, 2, 0]
+        # v (Red), w (Blue)
+        problem = cross_product_problem(self.v, self.w)
+        v_coords = problem["v"]
+        w_coords = problem["w"]
         
-        # Result of cross product: (2*2 - 0*1) = 4 in Z direction
-        # cross = [0, 0, 4] (Green)
-        cross_coords = [0, 0, 4]
+        # Result of cross product: for the defaults (2*2 - 0*1) = 4 in Z direction
+        # cross (Green)
+        cross_coords = problem["cross"]
 
-        arrow_v = Arrow3D(start=ORIGIN, end=v_coords, color=RED)
-        arrow_w = Arrow3D(start=ORIGIN, end=w_coords, color=BLUE)
+        arrow_v = snapshot(Arrow3D, start=ORIGIN, end=v_coords, color=RED)
+        arrow_w = snapshot(Arrow3D, start=ORIGIN, end=w_coords, color=BLUE)
         
         self.add(axes)
         
@@ -730,8 +749,8 @@ class CrossProductMagic(ThreeDScene): #ThreeDScene has different functions and M
         self.play(Create(arrow_v), Create(arrow_w))
         
         # Labeling vectors in 3D
-        label_v = Text("v", color=RED).move_to([2.2, 0, 0])
-        label_w = Text("w", color=BLUE).move_to([1, 2.2, 0])
+        label_v = Text("v", color=RED).move_to(label_position(v_coords))
+        label_w = Text("w", color=BLUE).move_to(label_position(w_coords))
         
         # Rotate labels to face camera
         self.add_fixed_orientation_mobjects(label_v)
@@ -749,10 +768,7 @@ class CrossProductMagic(ThreeDScene): #ThreeDScene has different functions and M
         # Draw the parallelogram
         # Points: Origin -> v -> (v+w) -> w -> Origin
         parallelogram = Polygon(#Mobject that is drawn using vector component indices as reference points
-            ORIGIN, 
-            v_coords, 
-            [v_coords[0] + w_coords[0], v_coords[1] + w_coords[1], 0], #I found that using the v and w coords is a convenient way to define my shapes size
-            w_coords,
+            *problem["parallelogram"], # origin, v, v + w, w: using the v and w coords is a convenient way to define my shapes size
             fill_color=YELLOW, 
             fill_opacity=0.3, 
             stroke_opacity=0
@@ -769,8 +785,8 @@ class CrossProductMagic(ThreeDScene): #ThreeDScene has different functions and M
         self.play(Write(explanation_2))
 
         # Show the cross product vector
-        arrow_cross = Arrow3D(start=ORIGIN, end=cross_coords, color=GREEN)
-        label_cross = Text("v x w", color=GREEN).move_to([0, 0, 4.2])
+        arrow_cross = snapshot(Arrow3D, start=ORIGIN, end=cross_coords, color=GREEN)
+        label_cross = Text("v x w", color=GREEN).move_to(label_position(cross_coords))
         self.add_fixed_orientation_mobjects(label_cross)
 
         # Use Create instead of GrowArrow :):):):):)
@@ -785,11 +801,8 @@ class CrossProductMagic(ThreeDScene): #ThreeDScene has different functions and M
         calc_box = Rectangle(height=2, width=5, fill_color=BLACK, fill_opacity=0.8, stroke_color=WHITE)
         calc_box.to_corner(UR)
         #chat, is that slang?
-        calc_text = MathTex(
-            r"\vec{v} &= \langle 2, 0, 0 \rangle \\",
-            r"\vec{w} &= \langle 1, 2, 0 \rangle \\",
-            r"|\vec{v} \times \vec{w}| &= (2)(2) - (0)(1) \\",
-            r"&= 4",
+        calc_text = snapshot(MathTex,
+            *problem["calc"],
             font_size=30
         ).move_to(calc_box.get_center())
         
@@ -855,12 +868,15 @@ class QuantumWave(Scene):
         # ValueTracker controls the 'time' parameter (position of the packet)
         t_tracker = ValueTracker(-4)
         
-        # always_redraw ensures the plot updates every frame based on t_tracker
-        wave_packet = always_redraw(lambda: axes.plot(
-            lambda x: np.exp(-1.5 * (x - t_tracker.get_value())**2) * np.cos(5 * (x - t_tracker.get_value())),
+        # WavePlot redraws the curve every frame based on t_tracker, evaluating psi on all x values at once
+        wave_packet = WavePlot(
+            axes,
+            lambda x, t: np.exp(-1.5 * (x - t)**2) * np.cos(5 * (x - t)),
+            t_tracker,
             color=YELLOW,
-            x_range=[-6, 6] # Limit drawing range to axis size
-        ))
+            x_range=[-6, 6], # Limit drawing range to axis size
+            tolerance=0.5 # Anchors only where the curve bends, within half a pixel
+        )
         
         self.play(Create(wave_packet))
         
@@ -898,7 +914,7 @@ class SneakPeek(ThreeDScene):
         # 3D rotation Matrix Equation
         # represent a rotation around the Z-axis
         # R_z(theta) * v
-        matrix_eq = MathTex(
+        matrix_eq = snapshot(MathTex,
             r"\begin{bmatrix} \cos\theta & -\sin\theta & 0 \\ \sin\theta & \cos\theta & 0 \\ 0 & 0 & 1 \end{bmatrix}",
             r"\begin{bmatrix} x \\ y \\ z \end{bmatrix}",
             font_size=36
@@ -918,7 +934,7 @@ class SneakPeek(ThreeDScene):
         # Note to self: In ThreeDScene, shifting objects works better than shifting camera sometimes
         axes_origin = [3, -1, 0]
         
-        axes = ThreeDAxes(
+        axes = snapshot(ThreeDAxes,
             x_length=5, y_length=5, z_length=4,
             axis_config={"include_tip": True}
         ).move_to(axes_origin)
@@ -926,7 +942,7 @@ class SneakPeek(ThreeDScene):
         # Create a vector inside this coordinate system
         # Vector v = [2, 1, 1] relative to the axes origin
         vec_coords = [axes_origin[0] + 2, axes_origin[1] + 1, axes_origin[2] + 1]
-        vector = Arrow3D(
+        vector = snapshot(Arrow3D,
             start=axes_origin, 
             end=vec_coords, 
             color=RED
@@ -0,0 +1,147 @@
+"""Relocatable, content-addressed cache for partial movie files.
+
+Out of the box manim keeps the segment for every play()/wait() under
+media/videos/scene/<quality>/partial_movie_files/<Scene>/<hash>.mp4 and
+lists them in partial_movie_file_list.txt with absolute file: paths from
+whichever machine rendered them. Here segments live in one shared store
+instead:
+
+    media/segments/<key[:2]>/<key>.mp4
+
+where the key only depends on what the segment looks like (manim's hash of
+the play call plus resolution, frame rate and format), never on the scene
+name, the checkout location or the machine. Copy media/segments/ to another
+machine or CI worker and every segment in it is reused there.
+
+Segments already sitting in the old per-scene folders are moved into the
+store the first time a render asks for them, and new segments are written
+to a temporary name and renamed into place, so several render workers can
+share one store.
+
+After each successful render the writer also records which segments the
+scene used in media/segments/manifests/<quality>/<Scene>.json and bumps
+their access time; cache_manager.py uses both to evict stale segments.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from manim import SceneFileWriter, config, logger, modify_atime, write_to_movie
+
+MEDIA_DIR = Path(__file__).resolve().parent / "media"
+SEGMENT_DIR = MEDIA_DIR / "segments"
+
+
+def segment_key(play_hash):
+    """Turns manim's per-play hash into a key that also covers the output format."""
+    content = "|".join([
+        play_hash,
+        f"{config.pixel_width}x{config.pixel_height}",
+        f"{config.frame_rate}fps",
+        config.movie_file_extension,
+        f"transparent={config.transparent}",
+    ])
+    return hashlib.sha256(content.encode()).hexdigest()[:40]
+
+
+def segment_path(key, segment_dir=SEGMENT_DIR):
+    # two-character fan out keeps any single folder from getting huge
+    return Path(segment_dir) / key[:2] / f"{key}{config.movie_file_extension}"
+
+
+def manifest_path(scene_name, resolution, segment_dir=SEGMENT_DIR):
+    return Path(segment_dir) / "manifests" / resolution / f"{scene_name}.json"
+
+
+class CachedSceneFileWriter(SceneFileWriter):
+    """SceneFileWriter that reads and writes partial movies from the shared segment store.
+
+    Use it through ``CairoRenderer(file_writer_class=CachedSceneFileWriter)``.
+    """
+
+    segment_dir = SEGMENT_DIR
+
+    def __init__(self, renderer, scene_name, **kwargs):
+        self.scene_name = str(scene_name)
+        super().__init__(renderer, scene_name, **kwargs)
+
+    def _is_cacheable(self, hash_animation):
+        # "uncached_00003" style names are used when caching is disabled, they aren't content hashes
+        return hash_animation is not None and not hash_animation.startswith("uncached_")
+
+    def add_partial_movie_file(self, hash_animation):
+        if not self._is_cacheable(hash_animation) or not hasattr(self, "partial_movie_directory") or not write_to_movie():
+            return super().add_partial_movie_file(hash_animation)
+
+        path = str(segment_path(segment_key(hash_animation), self.segment_dir))
+        self.partial_movie_files.append(path)
+        self.sections[-1].partial_movie_files.append(path)
+
+    def is_already_cached(self, hash_invocation):
+        if not hasattr(self, "partial_movie_directory") or not write_to_movie():
+            return False
+        path = segment_path(segment_key(hash_invocation), self.segment_dir)
+        if path.exists():
+            modify_atime(path)  # last use time, for LRU eviction
+            return True
+
+        # segment rendered before the shared store existed, adopt it
+        legacy_path = self.partial_movie_directory / f"{hash_invocation}{config.movie_file_extension}"
+        if legacy_path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(legacy_path, path)
+            modify_atime(path)
+            logger.info(f"Moved {legacy_path.name} into the segment store as {path.name}")
+            return True
+        return False
+
+    def open_partial_movie_stream(self, file_path=None):
+        if file_path is None:
+            file_path = self.partial_movie_files[self.renderer.num_plays]
+        self.finished_segment_path = Path(file_path)
+        self.finished_segment_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # encode under a name no other worker will look at, then rename once complete,
+        # so nobody ever picks up a half written segment from the shared store
+        temp_path = self.finished_segment_path.with_name(
+            f"{self.finished_segment_path.stem}.{os.getpid()}.tmp{self.finished_segment_path.suffix}"
+        )
+        super().open_partial_movie_stream(file_path=str(temp_path))
+
+    def close_partial_movie_stream(self):
+        super().close_partial_movie_stream()
+        os.replace(self.partial_movie_file_path, self.finished_segment_path)
+
+    def combine_to_movie(self):
+        super().combine_to_movie()
+
+        # remember which segments this scene is made of, anything in the store
+        # that no scene's manifest mentions can be evicted
+        segments = [
+            Path(path).relative_to(self.segment_dir).as_posix()
+            for path in self.partial_movie_files
+            if path is not None and Path(path).is_relative_to(self.segment_dir)
+        ]
+        path = manifest_path(self.scene_name, self.get_resolution_directory(), self.segment_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "scene": self.scene_name,
+            "rendered_at": time.time(),
+            "segments": segments,
+        }, indent=4))
+
+    def combine_files(self, input_files, output_file, create_gif=False, includes_sound=False):
+        super().combine_files(input_files, output_file, create_gif, includes_sound)
+
+        # manim writes absolute file: paths into the list, rewrite it relative to
+        # its own folder (that is how ffmpeg's concat demuxer resolves them) so
+        # the file doesn't point at one particular machine
+        file_list = self.partial_movie_directory / "partial_movie_file_list.txt"
+        with file_list.open("w", encoding="utf-8") as fp:
+            fp.write("# This file is used internally by FFMPEG.\n")
+            for pf_path in input_files:
+                relative = Path(os.path.relpath(Path(pf_path).resolve(), file_list.parent.resolve()))
+                fp.write(f"file '{relative.as_posix()}'\n")
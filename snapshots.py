@@ -0,0 +1,126 @@
+"""Store for fully constructed mobjects, so they're built once and loaded afterwards.
+
+Some mobjects take a while to build: ThreeDAxes with all its ticks, the
+Surface meshes of an Arrow3D, a multi-part MathTex (one SVG parse per
+part). ``snapshot(ThreeDAxes, x_range=...)`` builds the mobject the first
+time, writes it to media/snapshots/<key>.npz and loads it from there in
+every later run and in every other worker process.
+
+The file is a pickle of the mobject tree (classes, submobject structure,
+styles, every attribute) with all NumPy arrays (points, rgbas, ...) pulled
+out of the pickle and stored as arrays of the same .npz, so the bulk of the
+data loads as plain array reads. The key covers the class or function, its
+arguments, the frame size and the manim version.
+
+Snapshots are code: only load ones this project wrote itself.
+"""
+
+import hashlib
+import inspect
+import io
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+from manim import __version__, config, logger
+
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "media" / "snapshots"
+# switched off while tex_cache.py probes the scenes with placeholder formulas
+store_new = True
+
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickler that leaves NumPy arrays out of the stream and collects them in ``arrays``."""
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays = []
+        self.array_ids = {}  # id(array) -> index, so an array shared by two mobjects stays shared
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray or obj.dtype.hasobject:
+            return None
+        if id(obj) not in self.array_ids:
+            self.array_ids[id(obj)] = len(self.arrays)
+            self.arrays.append(obj)
+        return self.array_ids[id(obj)]
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    def __init__(self, file, arrays):
+        super().__init__(file)
+        self.arrays = arrays
+
+    def persistent_load(self, index):
+        return self.arrays[index]
+
+
+def save_snapshot(mobject, path):
+    buffer = io.BytesIO()
+    pickler = _ArrayPickler(buffer)
+    pickler.dump(mobject)
+    arrays = {f"array_{index}": array for index, array in enumerate(pickler.arrays)}
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(temp_path, tree=np.frombuffer(buffer.getvalue(), dtype=np.uint8), **arrays)
+    os.replace(temp_path, path)  # readers only ever see complete files
+
+
+def load_snapshot(path):
+    with np.load(path) as data:
+        tree = data["tree"].tobytes()
+        arrays = [data[f"array_{index}"] for index in range(len(data.files) - 1)]
+    return _ArrayUnpickler(io.BytesIO(tree), arrays).load()
+
+
+def snapshot_key(build, args, kwargs):
+    content = [
+        __version__,
+        f"{build.__module__}.{build.__qualname__}",
+        repr(args),
+        repr(sorted(kwargs.items())),
+        # default lengths and positions come from the frame size
+        f"{config.frame_width}x{config.frame_height}",
+        str(config.renderer),
+        config.tex_template.body,
+    ]
+    if not build.__module__.startswith("manim"):
+        # a builder from this project: editing it has to invalidate its snapshots.
+        # None if its source can't be found (defined in a REPL, ...)
+        try:
+            content.append(inspect.getsource(build))
+        except (OSError, TypeError):
+            return None
+    return hashlib.sha256("|".join(content).encode()).hexdigest()[:32]
+
+
+def snapshot(build, *args, **kwargs):
+    """``build(*args, **kwargs)``, loaded from the snapshot store when possible.
+
+    ``build`` is a mobject class or a function returning a mobject; the
+    result must not depend on anything but the arguments. Mobjects that
+    can't be pickled (say, with a lambda updater attached) are returned as
+    built and simply not stored.
+    """
+    key = snapshot_key(build, args, kwargs)
+    if key is None:
+        return build(*args, **kwargs)
+    path = SNAPSHOT_DIR / f"{key}.npz"
+    try:
+        return load_snapshot(path)
+    except (OSError, KeyError, ValueError, EOFError, pickle.UnpicklingError):
+        pass  # not stored yet, or a half copied file from somewhere
+
+    mobject = build(*args, **kwargs)
+    if not store_new:
+        return mobject
+    try:
+        save_snapshot(mobject, path)
+    except (pickle.PicklingError, TypeError, AttributeError) as error:
+        logger.warning(f"Can't snapshot {build.__qualname__}: {error}")
+        return mobject
+    # hand out the stored version on a miss too, so every run gets the exact same mobject
+    return load_snapshot(path)
@@ -0,0 +1,155 @@
+"""Compiles the TeX of every scene up front, several snippets at a time.
+
+Every MathTex/Tex (and every part of a multi-part MathTex) is one latex +
+dvisvgm run, and manim does them one after the other whenever construct()
+reaches them, with the render waiting on each. This module gets them out of
+the way first:
+
+1. construct() of each scene runs without rendering (frame_parallel's
+   ProbeRenderer), with manim's tex_to_svg_file swapped for one that only
+   notes down which SVGs are missing and hands back a placeholder shape,
+2. the missing SVGs are compiled concurrently, each in its own build
+   folder (manim's own compile clears out its Tex folder after every run,
+   so parallel builds can't share it), and renamed into manim's Tex folder
+   under the exact name manim looks for.
+
+A scene that trips over a placeholder (say it measures a formula and does
+something with the number) is probed again once the SVGs found so far are
+real, until nothing new turns up. The render afterwards finds every SVG
+already there and never starts latex.
+
+    python tex_cache.py                 # every scene
+    python tex_cache.py WorkIntegral    # just these
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from manim import config
+from manim.mobject.text import tex_mobject
+from manim.utils.tex_file_writing import make_tex_compilation_command, tex_hash
+
+import animations
+import snapshots
+
+# any shape will do, the probe only needs something to build the mobjects from
+PLACEHOLDER_SVG = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10"><path d="M0 0H10V10H0Z"/></svg>'
+
+
+def collect_tex(scene_names, placeholder):
+    """Runs construct() of the scenes and returns ``(missing, failed)``.
+
+    ``missing`` maps each SVG the scenes need but that doesn't exist yet to
+    ``(tex_code, tex_compiler, output_format)``; ``failed`` are the scenes
+    whose construct() raised before the end.
+    """
+    import scene as scene_module
+    from frame_parallel import ProbeRenderer
+
+    missing = {}
+
+    def record_tex(expression, environment=None, tex_template=None):
+        # same file naming as manim's generate_tex_file/tex_to_svg_file
+        tex_template = tex_template or config["tex_template"]
+        if environment is not None:
+            tex_code = tex_template.get_texcode_for_expression_in_env(expression, environment)
+        else:
+            tex_code = tex_template.get_texcode_for_expression(expression)
+        svg_file = config.get_dir("tex_dir") / f"{tex_hash(tex_code)}.svg"
+        if svg_file.exists():
+            return svg_file
+        missing.setdefault(svg_file, (tex_code, tex_template.tex_compiler, tex_template.output_format))
+        return placeholder
+
+    failed = []
+    tex_to_svg_file = tex_mobject.tex_to_svg_file
+    tex_mobject.tex_to_svg_file = record_tex
+    snapshots.store_new = False  # a formula built from placeholders must not end up in the store
+    try:
+        for name in scene_names:
+            try:
+                animations.build_scene(getattr(scene_module, name), renderer_class=ProbeRenderer).render()
+            except Exception as error:
+                print(f"{name}: probe stopped early ({error.__class__.__name__}: {error})", flush=True)
+                failed.append(name)
+    finally:
+        tex_mobject.tex_to_svg_file = tex_to_svg_file
+        snapshots.store_new = True
+    return missing, failed
+
+
+def compile_svg(svg_file, tex_code, tex_compiler, output_format):
+    """Builds ``svg_file`` from ``tex_code`` in a private folder. Returns whether it worked.
+
+    Failures are left for the real render to hit again, with manim's own
+    error report.
+    """
+    svg_file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="tex_build_", dir=svg_file.parent.parent) as build_dir:
+        build_dir = Path(build_dir)
+        tex_file = build_dir / f"{svg_file.stem}.tex"
+        tex_file.write_text(tex_code, encoding="utf-8")
+        command = make_tex_compilation_command(tex_compiler, output_format, tex_file, build_dir)
+        if subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+            return False
+
+        built_svg = tex_file.with_suffix(".svg")
+        subprocess.run([
+            "dvisvgm",
+            *(["--pdf"] if output_format == ".pdf" else []),
+            "--page=1",
+            "--no-fonts",
+            "--verbosity=0",
+            f"--output={built_svg.as_posix()}",
+            tex_file.with_suffix(output_format).as_posix(),
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not built_svg.exists():
+            return False
+        os.replace(built_svg, svg_file)
+    return True
+
+
+def warm_up(scene_names, quality="high_quality", jobs=None):
+    """Compiles every TeX snippet the scenes need that isn't cached yet. Returns how many were built."""
+    jobs = jobs or os.cpu_count() or 1
+    animations.configure_manim(quality)
+    attempted = set()
+    built = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        placeholder = Path(temp_dir) / "placeholder.svg"
+        placeholder.write_text(PLACEHOLDER_SVG)
+
+        remaining = list(scene_names)
+        while remaining:
+            missing, failed = collect_tex(remaining, placeholder)
+            new = {svg_file: job for svg_file, job in missing.items() if svg_file not in attempted}
+            if not new:
+                break  # whatever stops the failed scenes, it isn't a missing formula
+            attempted.update(new)
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                results = pool.map(lambda item: compile_svg(item[0], *item[1]), new.items())
+                built += sum(results)
+            remaining = failed
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the TeX of the scenes into manim's cache ahead of the render.")
+    parser.add_argument("scenes", nargs="*", help="scene class names (default: all of them)")
+    parser.add_argument("-q", "--quality", choices=animations.QUALITY_FLAGS, default="h")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="concurrent latex runs (default: one per core)")
+    args = parser.parse_args(argv)
+
+    names = args.scenes or [cls.__name__ for cls in animations.discover_scenes()]
+    built = warm_up(names, animations.QUALITY_FLAGS[args.quality], args.jobs)
+    print(f"compiled {built} TeX snippet(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Text whose parsed glyph outlines are cached on disk across runs.
+
+Every ``Text(...)`` goes through Pango to write an SVG (manim keeps those
+under media/texts/ already), and then through XML + svgelements parsing and
+a per-command Python loop that turns each glyph path into bezier points.
+That second half runs again in every fresh render process. CachedText
+stores its result, the flipped glyph points and their styles, next to the
+SVGs in media/texts/parsed/<key>.npz, so later runs only load a few arrays.
+
+The key covers the SVG's name (which manim derives from the text, font,
+size, slant, weight, color, ...) plus everything else that goes into the
+parse. Files are written under a temporary name and renamed into place, so
+any number of render workers can read and fill the cache at the same time.
+
+scene.py imports it as ``Text``.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from manim import Text, VMobject, __version__, config
+
+
+def parsed_dir():
+    return config.get_dir("text_dir") / "parsed"
+
+
+class CachedText(Text):
+    def glyph_cache_path(self):
+        content = "|".join([
+            __version__,
+            type(self).__name__,
+            Path(self.file_name).stem,
+            json.dumps(self.svg_default, sort_keys=True),
+            json.dumps(self.path_string_config, sort_keys=True),
+            str(config.renderer),
+        ])
+        return parsed_dir() / f"{hashlib.sha256(content.encode()).hexdigest()[:32]}.npz"
+
+    def generate_mobject(self):
+        path = self.glyph_cache_path()
+        glyphs = load_glyphs(path)
+        if glyphs is None:
+            super().generate_mobject()
+            glyphs = [(mob.points, mob.svg_style) for mob in self.submobjects]
+            save_glyphs(path, glyphs)
+            # build the glyphs from the stored form on a miss too, so the mobject (and
+            # with it manim's hash of every play it's in) is the same either way
+            self.remove(*self.submobjects)
+        self.add(*[glyph_mobject(points, style) for points, style in glyphs])
+
+    @staticmethod
+    def apply_style_to_mobject(mob, shape):
+        # what SVGMobject.apply_style_to_mobject sets, kept so it can be stored
+        mob.svg_style = {
+            "stroke_width": shape.stroke_width,
+            "stroke_color": shape.stroke.hexrgb,
+            "stroke_opacity": shape.stroke.opacity,
+            "fill_color": shape.fill.hexrgb,
+            "fill_opacity": shape.fill.opacity,
+        }
+        return Text.apply_style_to_mobject(mob, shape)
+
+
+def glyph_mobject(points, style):
+    glyph = VMobject()
+    glyph.points = points
+    glyph.set_style(**style)
+    return glyph
+
+
+def load_glyphs(path):
+    """``[(points, style), ...]`` from ``path``, or None if it isn't there (or isn't readable)."""
+    try:
+        with np.load(path) as data:
+            points = data["points"]
+            offsets = data["offsets"]
+            styles = json.loads(str(data["styles"]))
+    except (OSError, KeyError, ValueError):
+        return None
+    return [(points[start:stop], style) for start, stop, style in zip(offsets[:-1], offsets[1:], styles)]
+
+
+def save_glyphs(path, glyphs):
+    sizes = [len(points) for points, _ in glyphs]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(
+        temp_path,
+        points=np.concatenate([points for points, _ in glyphs]) if glyphs else np.zeros((0, 3)),
+        offsets=np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+        styles=np.array(json.dumps([style for _, style in glyphs])),
+    )
+    os.replace(temp_path, path)
@@ -0,0 +1,169 @@
+"""Opt-in timing spans of a render, written out as a Chrome trace.
+
+Shows where the time of a slow scene goes. Once ``enable()`` is called, the
+manim methods on the hot path record a span every time they run:
+
+* scene:     Scene.render, every play() and wait() (named after its animations)
+* animation: each animation's interpolate(), once per frame
+* updater:   each updater callback, named after the function (QuantumWave's
+             wave packet shows up as ``WavePlot.__init__.<locals>.<lambda>``)
+* raster:    the renderer's update_frame and the camera's capture_mobjects
+             (the static background and the moving mobjects separately)
+* writer:    handing frames to the writer thread, and in the writer thread
+             encoding them, opening/closing partial movies and combining them
+
+``write_trace`` saves the spans as Chrome trace JSON. Open it in
+https://ui.perfetto.dev or chrome://tracing. The batch renderer writes one
+per scene to media/traces/<Scene>.json:
+
+    python animations.py --trace WorkIntegral CrossProductMagic
+
+Recording a span means two perf_counter_ns() calls and a list append, about
+a microsecond. That is small next to rasterizing or encoding a
+frame, so tracing can stay on for real renders.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+from time import perf_counter_ns
+
+TRACE_DIR = Path(__file__).resolve().parent / "media" / "traces"
+
+_events = []  # (name, category, start_ns, end_ns, thread id)
+_thread_names = {}
+_originals = {}  # (owner, attribute) -> the method before enable() replaced it
+
+
+def _record(name, category, start):
+    thread = threading.get_ident()
+    if thread not in _thread_names:
+        _thread_names[thread] = threading.current_thread().name
+    _events.append((name, category, start, perf_counter_ns(), thread))
+
+
+def traced(function, category, name=None, label=None):
+    """Wraps ``function`` so every call is recorded as a span.
+
+    The span is called ``name`` (the function's qualified name by default),
+    or ``label(*args, **kwargs)`` if given.
+    """
+    name = name or function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record(label(*args, **kwargs) if label else name, category, start)
+
+    return wrapper
+
+
+def _play_label(scene, *args, **kwargs):
+    return "play " + ", ".join(type(arg).__name__ for arg in args)
+
+
+def _capture_label(camera, mobjects, **kwargs):
+    return "capture_mobjects" if kwargs.get("include_submobjects", True) else "capture_mobjects (layer)"
+
+
+def _update_to_time(scene, t):
+    # Scene.update_to_time, with a span per animation
+    dt = t - scene.last_t
+    scene.last_t = t
+    for animation in scene.animations:
+        start = perf_counter_ns()
+        animation.update_mobjects(dt)
+        animation.interpolate(t / animation.run_time)
+        _record(type(animation).__name__, "animation", start)
+    scene.update_mobjects(dt)
+    scene.update_meshes(dt)
+    scene.update_self(dt)
+
+
+def _update(mobject, dt=0, recursive=True):
+    # Mobject.update, with a span per updater
+    if mobject.updating_suspended:
+        return mobject
+    for updater in mobject.updaters:
+        start = perf_counter_ns()
+        if "dt" in inspect.signature(updater).parameters:
+            updater(mobject, dt)
+        else:
+            updater(mobject)
+        _record(getattr(updater, "__qualname__", repr(updater)), "updater", start)
+    if recursive:
+        for submobject in mobject.submobjects:
+            submobject.update(dt, recursive)
+    return mobject
+
+
+def _replace(owner, attribute, replacement):
+    _originals.setdefault((owner, attribute), getattr(owner, attribute))
+    setattr(owner, attribute, replacement)
+
+
+def enable():
+    """Starts recording. Patches manim's classes, so it affects the whole process."""
+    from manim import Camera, Mobject, Scene, SceneFileWriter
+    from manim.renderer.cairo_renderer import CairoRenderer
+
+    from writer import SceneWriter
+
+    if _originals:
+        return
+    _replace(Scene, "render", traced(Scene.render, "scene"))
+    _replace(Scene, "play", traced(Scene.play, "scene", label=_play_label))
+    _replace(Scene, "wait", traced(Scene.wait, "scene"))
+    _replace(Scene, "update_to_time", _update_to_time)
+    _replace(Mobject, "update", _update)
+    _replace(CairoRenderer, "update_frame", traced(CairoRenderer.update_frame, "raster"))
+    _replace(Camera, "capture_mobjects", traced(Camera.capture_mobjects, "raster", label=_capture_label))
+    for method in ["begin_animation", "end_animation", "combine_to_movie"]:
+        _replace(SceneFileWriter, method, traced(getattr(SceneFileWriter, method), "writer"))
+    # SceneWriter's own versions, its frames never reach SceneFileWriter's
+    for method in ["write_frame", "encode_and_write_frame"]:
+        _replace(SceneWriter, method, traced(getattr(SceneWriter, method), "writer"))
+
+
+def disable():
+    """Puts manim's methods back. The spans recorded so far are kept."""
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+
+
+def clear():
+    _events.clear()
+
+
+def write_trace(path):
+    """Saves the spans recorded so far as Chrome trace JSON to ``path``."""
+    pid = os.getpid()
+    origin = min((event[2] for event in _events), default=0)
+    trace_events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name}}
+        for thread, name in _thread_names.items()
+    ]
+    trace_events += [
+        {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - origin) / 1000,  # microseconds
+            "dur": (end - start) / 1000,
+            "pid": pid,
+            "tid": thread,
+        }
+        for name, category, start, end, thread in _events
+    ]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fp:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, fp, separators=(",", ":"))
@@ -0,0 +1,195 @@
+"""Renders DefineBasis, DotProduct and CrossProductMagic for a table of other vectors.
+
+The three scenes take their vectors from class attributes and work out
+everything else (results, projections, LaTeX) in problems.py, so a variant
+is just a subclass with other attributes. The table is a JSON list with
+one record per variant:
+
+    [
+        {"scene": "DotProduct", "v": [4, 1], "w": [1, 3]},
+        {"scene": "DotProduct", "name": "DotProductNegative", "v": [2, 1], "w": [-3, 1]},
+        {"scene": "CrossProductMagic", "v": [1, 1, 0], "w": [-1, 2, 0]},
+        {"scene": "DefineBasis", "v": [-2, 3]}
+    ]
+
+    python variants.py problems.json            # 1080p60, one worker per core
+    python variants.py problems.json -q l -j 4
+
+Movies land in media/videos/variants/<resolution>/<name>.mp4, the name
+defaulting to <scene>_<row number>. Every record is checked before anything
+renders (a zero vector, perpendicular vectors for DotProduct, ...).
+
+Each worker process renders a whole batch of variants, grouped by scene,
+one after the other, so what they have in common is built once: the
+NumberPlane (mobjects.number_plane), the ThreeDAxes and other snapshots,
+Text glyphs and compiled TeX. Plays that look the same in every variant
+(DotProduct's title, DefineBasis' grid and basis vectors) are the same
+segments in the shared segment store, so they're encoded once for the
+whole table. Variants whose scene code and vectors haven't changed since
+their last render are skipped, like in animations.py.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import animations
+import fingerprints
+import problems
+
+# scene -> (function checking and working out its parameters, the parameters it takes)
+PARAMETERS = {
+    "DefineBasis": (problems.basis_problem, ["v"]),
+    "DotProduct": (problems.dot_product_problem, ["v", "w"]),
+    "CrossProductMagic": (problems.cross_product_problem, ["v", "w"]),
+}
+VARIANTS_FILE = Path(__file__).resolve()
+
+
+def variant_dir(quality):
+    """Like animations.video_dir, under media/videos/variants/ instead of scene/."""
+    return animations.MEDIA_DIR / "videos" / VARIANTS_FILE.stem / animations.video_dir(quality).name
+
+
+def load_table(path):
+    """Reads and checks the table. Returns ``[{"scene", "name", "params"}, ...]``; raises ValueError on bad records."""
+    with open(path, encoding="utf-8") as fp:
+        records = json.load(fp)
+    variants = []
+    for row, record in enumerate(records, 1):
+        record = dict(record)
+        scene = record.pop("scene", None)
+        if scene not in PARAMETERS:
+            raise ValueError(f"row {row}: scene has to be one of {', '.join(PARAMETERS)}, not {scene!r}")
+        name = record.pop("name", f"{scene}_{row:03}")
+        if not name.isidentifier():
+            raise ValueError(f"row {row}: {name!r} can't be used as a scene name")
+        problem, parameters = PARAMETERS[scene]
+        unknown = set(record) - set(parameters)
+        if unknown:
+            raise ValueError(f"row {row}: {scene} doesn't take {', '.join(sorted(unknown))}")
+        try:
+            problem(**record)
+        except (ValueError, TypeError) as error:
+            raise ValueError(f"row {row} ({name}): {error}") from None
+        variants.append({"scene": scene, "name": name, "params": record})
+
+    names = [variant["name"] for variant in variants]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"names used more than once: {', '.join(duplicates)}")
+    return variants
+
+
+def variant_class(scene_class, name, params):
+    return type(name, (scene_class,), dict(params))
+
+
+def render_batch(variants, quality, log_path):
+    """Worker side: renders ``variants`` one after the other in this process."""
+    from manim import config
+
+    import scene as scene_module
+
+    animations.redirect_output(log_path)
+    results = []
+    for variant in variants:
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            animations.configure_manim(quality)
+            config.input_file = str(VARIANTS_FILE)  # media/videos/variants/...
+            scene_class = variant_class(getattr(scene_module, variant["scene"]), variant["name"], variant["params"])
+            animations.build_scene(scene_class).render()
+        except Exception:
+            status = "failed"
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        results.append({**variant, "status": status, "seconds": time.perf_counter() - start, "log": str(log_path)})
+    return results
+
+
+def render_variants(variants, quality="high_quality", jobs=None, log_dir=animations.LOG_DIR):
+    """Renders the variants on a pool of workers, a batch per worker. Returns one result dict per variant."""
+    jobs = min(jobs or os.cpu_count() or 1, len(variants)) or 1
+    # dealt out round robin after sorting by scene, so every batch gets a share of each scene
+    # and all the variants of one scene in a batch reuse the same construction work
+    ordered = sorted(variants, key=lambda variant: variant["scene"])
+    batches = [ordered[index::jobs] for index in range(jobs)]
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"),
+                             max_tasks_per_child=1) as pool:
+        futures = {
+            pool.submit(render_batch, batch, quality, Path(log_dir) / f"variants_{index}.log"): batch
+            for index, batch in enumerate(batches)
+        }
+        for future in as_completed(futures):
+            try:
+                batch_results = future.result()
+            except Exception as error:  # the worker died, the whole batch is lost
+                batch_results = [
+                    {**variant, "status": f"crashed ({error.__class__.__name__})", "seconds": float("nan"), "log": ""}
+                    for variant in futures[future]
+                ]
+            for result in batch_results:
+                print(f"  {result['name']:<32} {result['status']:<10} {result['seconds']:7.1f}s", flush=True)
+            results += batch_results
+    names = [variant["name"] for variant in variants]
+    results.sort(key=lambda result: names.index(result["name"]))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render scene variants from a table of parameters.")
+    parser.add_argument("table", help="JSON list of {scene, name, v, w} records")
+    parser.add_argument("-q", "--quality", choices=animations.QUALITY_FLAGS, default="h")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="render variants even if they're up to date")
+    args = parser.parse_args(argv)
+
+    try:
+        variants = load_table(args.table)
+    except ValueError as error:
+        parser.error(str(error))
+    quality = animations.QUALITY_FLAGS[args.quality]
+    output_dir = variant_dir(quality)
+
+    scene_classes = {cls.__name__: cls for cls in animations.discover_scenes()}
+    prints = {
+        variant["name"]: fingerprints.scene_fingerprint(
+            scene_classes[variant["scene"]], {"quality": quality, "params": variant["params"]}
+        )
+        for variant in variants
+    }
+    if not args.force:
+        variants = [
+            variant for variant in variants
+            if not fingerprints.is_up_to_date(variant["name"], prints[variant["name"]], output_dir)
+        ]
+    if not variants:
+        print("All variants are up to date")
+        return 0
+
+    start = time.perf_counter()
+    print(f"Rendering {len(variants)} variant(s) at {quality}")
+    results = render_variants(variants, quality, args.jobs)
+    for result in results:
+        if result["status"] == "ok":
+            fingerprints.record_fingerprint(result["name"], prints[result["name"]], output_dir)
+    failed = [result["name"] for result in results if result["status"] != "ok"]
+    print(f"\n{len(results) - len(failed)} rendered, {len(failed)} failed in {time.perf_counter() - start:.1f}s")
+    if failed:
+        print(f"failed: {', '.join(failed)} (see the logs in {animations.LOG_DIR})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
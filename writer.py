@@ -0,0 +1,297 @@
+"""The SceneFileWriter used by the batch renderer.
+
+Builds on the shared segment store from segment_cache.py and adds the
+encoding side optimizations:
+
+* Held frames. When nothing on screen changes during a wait() (no updaters,
+  no ambient camera rotation) manim already rasterizes the frame only once,
+  but then hands the encoder the same 1920x1080 RGBA frame 60 times per
+  second of waiting, and each copy goes through the RGBA -> YUV conversion
+  again. Here the frame is converted once and the repeats are fed to the
+  encoder straight from the converted planes.
+* Bounded frame queue. Rasterizing (main thread) and encoding (manim's
+  writer thread) already overlap, but manim hands every frame over as a
+  fresh 8 MB copy on an unbounded queue, so whenever the encoder falls
+  behind, a long play piles up gigabytes of frames. Here frames go through
+  a fixed ring of preallocated buffers: the writer thread hands a buffer
+  back once it's encoded, and when all of them are in flight the renderer
+  waits for the encoder. If the writer thread dies (encoder error, disk
+  full), its exception is raised in the render thread instead, and the
+  unfinished segment never reaches the store.
+* No frame copies. LayeredRenderer borrows a free buffer of the ring
+  (``lend_buffer``) as the camera's pixel array before drawing, so cairo
+  draws each frame right into the buffer the encoder then reads, and the
+  frame is handed over as it is. Only frames drawn elsewhere (the frozen
+  frame of a wait, say) get copied into the ring.
+
+StreamingSceneWriter is the variant for one-shot renders that don't need
+the segment cache: one encoder for the whole scene, no partial movies. It
+can also encode smaller versions of the scene (720p30, 480p15, ...) from
+the same frames as it goes, see ``extra_outputs``.
+"""
+
+import os
+from pathlib import Path
+from queue import Empty, Queue
+
+import av
+import numpy as np
+from manim import SceneFileWriter, config, is_gif_format, logger, write_to_movie
+from manim.scene.scene_file_writer import to_av_frame_rate
+
+from segment_cache import CachedSceneFileWriter
+
+
+class SceneWriter(CachedSceneFileWriter):
+    # frames in flight between renderer and encoder, 8 x 8 MB at 1080p
+    frame_buffers = 8
+
+    def __init__(self, renderer, scene_name, **kwargs):
+        super().__init__(renderer, scene_name, **kwargs)
+        self.ring = None
+        self.ring_views = []
+        self.free_buffers = Queue()
+        self.lent = None  # buffer handed to the renderer to draw the next frame in
+        self.writer_error = None  # what stopped the writer thread, raised again on the render side
+
+    def allocate_ring(self, shape, dtype):
+        if self.ring is not None and self.ring.shape[1:] == shape and self.ring.dtype == dtype:
+            return
+        self.ring = np.empty((self.frame_buffers, *shape), dtype=dtype)
+        # always the same view objects, the camera caches a cairo context per pixel array object
+        self.ring_views = list(self.ring)
+        self.free_buffers = Queue()
+        for index in range(self.frame_buffers):
+            self.free_buffers.put(index)
+        self.lent = None
+
+    def lend_buffer(self, shape, dtype):
+        """A free frame buffer for the renderer to draw the next frame into.
+
+        Stays lent (the same buffer is returned again) until it comes back
+        through write_frame, which then queues it for the encoder as is.
+        Blocks while every other buffer is still waiting to be encoded.
+        """
+        self.allocate_ring(shape, dtype)
+        if self.lent is None:
+            self.lent = self.take_free_buffer()
+        return self.ring_views[self.lent]
+
+    def take_free_buffer(self):
+        """Index of a buffer the encoder is done with, waits while all of them are in flight.
+
+        Raises whatever stopped the writer thread instead of waiting for it forever.
+        """
+        while True:
+            if self.writer_error is not None:
+                raise self.writer_error
+            try:
+                return self.free_buffers.get(timeout=1)
+            except Empty:
+                writer_thread = getattr(self, "writer_thread", None)
+                if self.writer_error is None and (writer_thread is None or not writer_thread.is_alive()):
+                    raise RuntimeError("every frame buffer is in flight but no writer thread is left to free one")
+
+    def write_frame(self, frame_or_renderer, num_frames=1):
+        if not write_to_movie():
+            return super().write_frame(frame_or_renderer, num_frames)
+        frame = frame_or_renderer
+        if self.lent is not None and frame is self.ring_views[self.lent]:
+            index, self.lent = self.lent, None  # drawn in place, nothing to copy
+        else:
+            self.allocate_ring(frame.shape, frame.dtype)
+            index = self.take_free_buffer()  # blocks while the encoder is frame_buffers frames behind
+            np.copyto(self.ring_views[index], frame)
+        self.queue.put((num_frames, index))
+
+    def listen_and_write(self):
+        try:
+            while True:
+                num_frames, index = self.queue.get()
+                if index is None:
+                    break
+                self.encode_and_write_frame(self.ring_views[index], num_frames)
+                self.free_buffers.put(index)
+        except Exception as error:  # encoder error, disk full, ...
+            self.writer_error = error
+
+    def close_partial_movie_stream(self):
+        # stop the writer thread first, a segment it didn't finish mustn't go into the store
+        self.queue.put((-1, None))
+        self.writer_thread.join()
+        if self.writer_error is not None:
+            raise self.writer_error
+        super().close_partial_movie_stream()  # queues another stop for the finished thread, harmless
+
+    def encode_and_write_frame(self, frame, num_frames):
+        if num_frames == 1 or self.video_stream.pix_fmt != "yuv420p":
+            return super().encode_and_write_frame(frame, num_frames)
+
+        # convert the held frame once. The encoder still needs a fresh VideoFrame per
+        # repeat (it keeps references for lookahead, see the note in manim's version
+        # of this method), but copying the ready made yuv planes is ~5x less work
+        # than converting 8 MB of RGBA again every time
+        yuv = av.VideoFrame.from_ndarray(frame, format="rgba").reformat(format="yuv420p").to_ndarray()
+        for _ in range(num_frames):
+            av_frame = av.VideoFrame.from_ndarray(yuv, format="yuv420p")
+            for packet in self.video_stream.encode(av_frame):
+                self.video_container.mux(packet)
+
+
+class ExtraOutput:
+    """A smaller, lower frame rate version of a movie, encoded from its frames as they come in.
+
+    Every ``step``-th frame of the full size movie is scaled down and
+    encoded, so 60 fps becomes 30 fps with a step of 2, 15 fps with 4.
+    """
+
+    def __init__(self, path, height, frame_rate):
+        step = config.frame_rate / frame_rate
+        if height > config.pixel_height or step != int(step):
+            raise ValueError(
+                f"can't make {height}p{frame_rate} out of {config.pixel_height}p{config.frame_rate:g}, "
+                "it needs a lower resolution and a frame rate the main one is a multiple of"
+            )
+        self.step = int(step)
+        self.height = height
+        # same aspect ratio, libx264 wants even sizes
+        self.width = round(config.pixel_width * height / config.pixel_height / 2) * 2
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.temp_path = self.path.with_name(f"{self.path.stem}.{os.getpid()}.tmp{self.path.suffix}")
+        self.container = av.open(str(self.temp_path), mode="w")
+        self.stream = self.container.add_stream("libx264", rate=to_av_frame_rate(frame_rate), options={"crf": "23"})
+        self.stream.pix_fmt = "yuv420p"
+        self.stream.width = self.width
+        self.stream.height = self.height
+
+    def write(self, frame, first_index, num_frames):
+        """Takes frames ``first_index`` to ``first_index + num_frames - 1`` of the main movie, all showing ``frame``."""
+        kept = len(range(-first_index % self.step, num_frames, self.step))
+        if not kept:
+            return
+        yuv = (
+            av.VideoFrame.from_ndarray(frame, format="rgba")
+            .reformat(width=self.width, height=self.height, format="yuv420p")
+            .to_ndarray()
+        )
+        for _ in range(kept):
+            for packet in self.stream.encode(av.VideoFrame.from_ndarray(yuv, format="yuv420p")):
+                self.container.mux(packet)
+
+    def close(self):
+        for packet in self.stream.encode():
+            self.container.mux(packet)
+        self.container.close()
+        os.replace(self.temp_path, self.path)
+
+
+class StreamingSceneWriter(SceneWriter):
+    """Encodes the whole scene with one encoder straight into the final movie.
+
+    The normal writer starts an encoder per play()/wait(), writes it out as
+    a partial movie and joins those at the end, which is what lets unchanged
+    segments be reused. A scene like ThanksForWatching is dozens of short
+    plays, so without the reuse that's dozens of encoder startups, files and
+    a concat pass for nothing. Here the first play opens the encoder (and
+    its writer thread), every following play keeps feeding it, and the end
+    of the scene closes it and renames the file into place.
+
+    Only for renders with caching disabled (every play is rendered anyway)
+    and video output; gifs go through the normal partial movie route.
+
+    ``extra_outputs`` lists ``(height, frame_rate)`` versions to produce in
+    the same pass, e.g. ``[(720, 30), (480, 15)]`` next to a 1080p60 render.
+    They are written where a render at that quality would put them
+    (media/videos/scene/720p30/<Scene>.mp4, ...), with the decimation
+    counted over the whole scene so no play drifts out of step.
+    """
+
+    extra_outputs = []
+
+    def __init__(self, renderer, scene_name, **kwargs):
+        super().__init__(renderer, scene_name, **kwargs)
+        self.streaming = not is_gif_format()
+        self.stream_open = False
+        self.extras = []
+        self.frames_written = 0
+
+    def open_partial_movie_stream(self, file_path=None):
+        if not self.streaming:
+            return super().open_partial_movie_stream(file_path)
+        if self.stream_open:
+            return
+        self.stream_path = self.movie_file_path.with_name(
+            f"{self.movie_file_path.stem}.{os.getpid()}.tmp{self.movie_file_path.suffix}"
+        )
+        self.stream_path.parent.mkdir(parents=True, exist_ok=True)
+        # SceneFileWriter's, the segment store has nothing to do with this file
+        self.extras = [
+            ExtraOutput(
+                self.movie_file_path.parent.parent / f"{height}p{frame_rate}" / self.movie_file_path.name,
+                height,
+                frame_rate,
+            )
+            for height, frame_rate in self.extra_outputs
+        ]
+        SceneFileWriter.open_partial_movie_stream(self, file_path=str(self.stream_path))
+        self.stream_open = True
+
+    def encode_and_write_frame(self, frame, num_frames):
+        super().encode_and_write_frame(frame, num_frames)
+        for extra in self.extras:
+            extra.write(frame, self.frames_written, num_frames)
+        self.frames_written += num_frames
+
+    def close_partial_movie_stream(self):
+        if not self.streaming:
+            super().close_partial_movie_stream()
+        # otherwise the stream stays open for the next play
+
+    def combine_to_movie(self):
+        if not self.streaming:
+            return super().combine_to_movie()
+        if not self.stream_open:
+            logger.info("No animations are contained in this scene.")
+            return
+        SceneFileWriter.close_partial_movie_stream(self)
+        self.stream_open = False
+        if self.writer_error is not None:
+            raise self.writer_error
+        os.replace(self.stream_path, self.movie_file_path)
+        for extra in self.extras:
+            extra.close()
+            logger.info(f"Wrote {extra.path}")
+        if self.includes_sound:
+            logger.warning("Streaming output has no sound track, the scene's sounds were left out.")
+        logger.info(f"Streamed {self.renderer.num_plays} plays into {self.movie_file_path}")
+
+
+def concat_movies(input_files, output_file):
+    """Joins movies with identical encoding settings into one file without re-encoding.
+
+    Same packet copy manim uses to combine partial movie files, minus the
+    gif/audio handling, for pieces rendered outside of a SceneFileWriter.
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    file_list = output_file.with_name(f"{output_file.stem}.{os.getpid()}.concat.txt")
+    with file_list.open("w", encoding="utf-8") as fp:
+        for path in input_files:
+            fp.write(f"file '{Path(path).resolve().as_posix()}'\n")
+
+    try:
+        with av.open(str(file_list), options={"safe": "0", "an": "1"}, format="concat") as movies_input:
+            movies_stream = movies_input.streams.video[0]
+            with av.open(str(output_file), mode="w") as output_container:
+                output_stream = output_container.add_stream(template=movies_stream)
+                for packet in movies_input.demux(movies_stream):
+                    # skip the flushing packets demux generates
+                    if packet.dts is None:
+                        continue
+                    # dts of consecutive files aren't monotonic, let libav recompute them
+                    packet.dts = None
+                    packet.stream = output_stream
+                    output_container.mux(packet)
+    finally:
+        file_list.unlink()